@@ -20,15 +20,22 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import functools
+import heapq
+import importlib.metadata
 import json
+import mmap
 import os
 import platform
 import re
 import shutil
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
 
 try:
     import tomllib  # py311+
@@ -41,6 +48,12 @@ try:
 except Exception:  # pragma: no cover
     psycopg = None
 
+# orjson är valfritt – snabbare JSON-dump, annars stdlib json
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
 # Load .env so DATABASE_URL etc. are available
 try:
     from dotenv import load_dotenv  # type: ignore
@@ -63,96 +76,245 @@ SCHEMA_CANDIDATES = ["schema.sql", "db/schema.sql"]
 # Tunables via env/flags
 DEFAULT_MAX_DEPTH = 3
 DEFAULT_TOPN = 10
+# Sektioner som kan väljas med --sections ("all" = alla utom make/services, som styrs av egna flaggor)
+SECTIONS = ("project", "files", "git", "tree", "db", "scan", "python", "make", "services")
+DEFAULT_SECTIONS = frozenset(SECTIONS) - {"make", "services"}
 
-def sha1sum(p: Path, block: int = 1024 * 1024) -> str:
+def sha1sum(p: str | os.PathLike) -> str:
     import hashlib
-    h = hashlib.sha1()
-    with p.open("rb") as f:
-        while True:
-            b = f.read(block)
-            if not b:
-                break
-            h.update(b)
-    return h.hexdigest()
-
-def count_lines(p: Path) -> int:
+    with open(p, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # py311+, läser i C utan Python-loop
+            return hashlib.file_digest(f, "sha1").hexdigest()
+        h = hashlib.sha1()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        except ValueError:  # tom fil kan inte mmap:as
+            pass
+        return h.hexdigest()
+
+# Numba (valfritt) används bara för mycket stora filer; importeras först när en sådan dyker upp
+NUMBA_MIN_BYTES = 64 * 1024 * 1024
+_numba_kernel: Any = None  # None = ej laddad, False = numba/numpy saknas
+
+
+def _load_numba_kernel() -> Any:
+    global _numba_kernel
+    if _numba_kernel is None:
+        try:
+            import numpy as np  # type: ignore
+            from numba import njit, prange  # type: ignore
+
+            @njit(cache=True, parallel=True, boundscheck=False)
+            def count_newlines(buf):  # pragma: no cover - kompileras av numba
+                n = 0
+                for i in prange(buf.size):
+                    n += buf[i] == 10
+                return n
+
+            _numba_kernel = (count_newlines, np)
+        except Exception:
+            _numba_kernel = False
+    return _numba_kernel
+
+
+def _count_lines_numba(p: str | os.PathLike) -> int | None:
+    loaded = _load_numba_kernel()
+    if not loaded:
+        return None
+    kernel, np = loaded
     try:
-        with p.open("rb") as f:
-            return sum(1 for _ in f)
+        with open(p, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            total = int(kernel(buf))
+            del buf  # släpp bufferten innan mmap stängs
+            if len(mm) and mm[-1] != 10:
+                total += 1
+            return total
+    except Exception:
+        return None
+
+
+def count_lines(p: str | os.PathLike, size: int | None = None, block: int = 1024 * 1024) -> int:
+    # Räkna b"\n" per block i C; en sista rad utan radbrytning räknas också (som `for line in f`)
+    if size is not None and size >= NUMBA_MIN_BYTES:
+        n = _count_lines_numba(p)
+        if n is not None:
+            return n
+    total = 0
+    last = b""
+    try:
+        with open(p, "rb", buffering=0) as f:
+            read = f.read
+            while True:
+                b = read(block)
+                if not b:
+                    break
+                total += b.count(b"\n")
+                last = b
     except Exception:
         return 0
+    if last and not last.endswith(b"\n"):
+        total += 1
+    return total
 
-def collect_files(root: Path) -> list[Path]:
-    out: list[Path] = []
-    for dirpath, dirnames, filenames in os.walk(root):
-        # prune ignored dirs
-        base = os.path.basename(dirpath)
-        if base in IGNORED_DIRS:
-            dirnames[:] = []
-            continue
-        for d in list(dirnames):
-            if d in IGNORED_DIRS:
-                dirnames.remove(d)
-        for fn in filenames:
-            p = Path(dirpath) / fn
+def _scan(dirpath: str) -> Iterator[os.DirEntry]:
+    # os.scandir ger typ (och på Windows stat) direkt från katalogläsningen
+    try:
+        it = os.scandir(dirpath)
+    except OSError:
+        return
+    with it:
+        for e in it:
             try:
-                if p.is_file():
-                    out.append(p)
-            except Exception:
-                pass
-    return out
+                if e.is_dir(follow_symlinks=False):
+                    if e.name in IGNORED_DIRS:
+                        continue
+                    yield from _scan(e.path)
+                elif e.is_file():
+                    yield e
+            except OSError:
+                continue
+
+class FileRec(NamedTuple):
+    path: str
+    relpath: str
+    top: str
+    size: int
+    mtime: float
 
-def per_dir_stats(root: Path, files: list[Path]) -> list[dict]:
-    buckets: dict[str, dict[str, int]] = {}
-    for p in files:
-        try:
-            rel = p.relative_to(root)
-        except Exception:
-            continue
-        top = rel.parts[0] if rel.parts else "."
-        b = buckets.setdefault(top, {"files": 0, "bytes": 0, "lines": 0})
-        b["files"] += 1
-        try:
-            st = p.stat()
-            b["bytes"] += int(st.st_size)
-            b["lines"] += count_lines(p)
-        except Exception:
-            pass
-    out = []
-    for k, v in sorted(buckets.items(), key=lambda x: (-x[1]["bytes"], x[0])):
-        out.append({"path": k, **v})
-    return out
 
-def largest_files(root: Path, files: list[Path], n: int) -> list[dict]:
-    sized: list[tuple[int, Path]] = []
-    for p in files:
+def iter_records(root: Path) -> Iterator[FileRec]:
+    """En FileRec per fil, byggd direkt från DirEntry – ingen ny stat eller Path per konsument."""
+    prefix = os.path.join(str(root), "")  # DirEntry.path börjar alltid med detta
+    cut = len(prefix)
+    for e in _scan(str(root)):
         try:
-            sized.append((int(p.stat().st_size), p))
-        except Exception:
+            st = e.stat()
+        except OSError:
             continue
-    sized.sort(reverse=True, key=lambda t: t[0])
-    return [{"path": str(p.relative_to(root)), "bytes": sz, "sha1": sha1sum(p)} for sz, p in sized[:n]]
+        rel = e.path[cut:]
+        yield FileRec(e.path, rel, rel.split(os.sep, 1)[0], int(st.st_size), st.st_mtime)
 
-def recently_modified(root: Path, files: list[Path], n: int) -> list[dict]:
-    timed: list[tuple[float, Path]] = []
-    for p in files:
-        try:
-            timed.append((p.stat().st_mtime, p))
-        except Exception:
+
+def _keep_top(heap: list, item: tuple, n: int) -> None:
+    # Min-heap med de n största; de flesta filer slår inte heap[0] och kostar då bara en jämförelse
+    if len(heap) < n:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def scan_tree(root: Path, topn: int) -> dict:
+    """Ett pass över filträdet: per-katalog-stats samt största och senast ändrade filer.
+    Varje fil stat:as en gång; topplistorna hålls som heapar med högst topn element."""
+    buckets: dict[str, dict[str, int]] = {}
+    largest: list[tuple[int, FileRec]] = []
+    recent: list[tuple[float, FileRec]] = []
+    for rec in iter_records(root):
+        b = buckets.setdefault(rec.top, {"files": 0, "bytes": 0, "lines": 0})
+        b["files"] += 1
+        b["bytes"] += rec.size
+        b["lines"] += count_lines(rec.path, rec.size)
+        if topn <= 0:
             continue
-    timed.sort(reverse=True, key=lambda t: t[0])
-    from datetime import datetime
-    return [{"path": str(p.relative_to(root)), "mtime": datetime.utcfromtimestamp(ts).isoformat(timespec="seconds") + "Z"} for ts, p in timed[:n]]
+        _keep_top(largest, (rec.size, rec), topn)
+        _keep_top(recent, (rec.mtime, rec), topn)
+
+    by_dir = [{"path": k, **v} for k, v in sorted(buckets.items(), key=lambda x: (-x[1]["bytes"], x[0]))]
+    largest = heapq.nlargest(topn, largest)
+    paths = [rec.path for _, rec in largest]
+    if len(paths) > 2:
+        # hashlib släpper GIL:en under hashningen, så trådar räcker för att använda alla kärnor
+        with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as ex:
+            sums = list(ex.map(sha1sum, paths))
+    else:
+        sums = [sha1sum(p) for p in paths]
+    return {
+        "by_dir": by_dir,
+        "largest": [{"path": rec.relpath, "bytes": sz, "sha1": h} for (sz, rec), h in zip(largest, sums)],
+        "recent": [
+            {"path": rec.relpath, "mtime": dt.datetime.utcfromtimestamp(ts).isoformat(timespec="seconds") + "Z"}
+            for ts, rec in heapq.nlargest(topn, recent)
+        ],
+    }
+
+# Subprocess-utdata cachas mellan körningar, nycklat på mtime för de filer som styr utdatan
+CACHE_PATH = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "project_snapshot.json"
+_cache_lock = threading.Lock()
+_disk_cache: dict[str, str | None] | None = None
+_cache_used: set[str] = set()
 
-def safe_run(cmd: list[str]) -> str:
+
+def _load_disk_cache() -> dict[str, str | None]:
+    global _disk_cache
+    with _cache_lock:
+        if _disk_cache is None:
+            try:
+                _disk_cache = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+            except Exception:
+                _disk_cache = {}
+        return _disk_cache
+
+
+def save_run_cache() -> None:
+    """Skriv tillbaka de cacheposter som användes i denna körning (äldre nycklar rensas)."""
+    if _disk_cache is None:
+        return
     try:
-        return subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        keep = {k: v for k, v in _disk_cache.items() if k in _cache_used}
+        CACHE_PATH.write_text(json.dumps(keep), encoding="utf-8")
     except Exception:
-        return ""
+        pass
+
+
+def _mtime_key(*paths: str | os.PathLike) -> tuple[int, ...] | None:
+    try:
+        return tuple(os.stat(p).st_mtime_ns for p in paths)
+    except OSError:
+        return None
+
+
+def _run(cmd: tuple[str, ...], cwd: str | None = None) -> str | None:
+    try:
+        return subprocess.check_output(list(cmd), cwd=cwd, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def _run_cached(cmd: tuple[str, ...], cache_key: tuple | None, cwd: str | None = None) -> str | None:
+    if cache_key is None:  # okänt tillstånd – kör utan cache (inte heller lru)
+        return _run(cmd, cwd)
+    return _run_cached_keyed(cmd, cache_key, cwd)
+
+
+@functools.lru_cache(maxsize=64)
+def _run_cached_keyed(cmd: tuple[str, ...], cache_key: tuple, cwd: str | None) -> str | None:
+    key = json.dumps([cmd, cwd, cache_key])
+    cache = _load_disk_cache()
+    with _cache_lock:
+        _cache_used.add(key)
+        if key in cache:
+            return cache[key]
+    out = _run(cmd, cwd)
+    with _cache_lock:
+        cache[key] = out
+    return out
+
+
+_FREEZE_SKIP = {"pip", "setuptools", "wheel", "distribute"}  # döljs även av `pip freeze`
+
 
 def python_info() -> dict:
+    # Samma name==version-lista som `pip freeze`, men utan att starta pip i en subprocess
     try:
-        out = safe_run([sys.executable, "-m", "pip", "freeze"])[:2000]
+        dists: dict[str, str] = {}
+        for d in importlib.metadata.distributions():
+            name = d.metadata["Name"]
+            if name and name.lower() not in _FREEZE_SKIP:
+                dists.setdefault(name, f"{name}=={d.version}")
+        out = "\n".join(sorted(dists.values(), key=str.lower))[:2000]
     except Exception:
         out = ""
     return {"python": sys.version.split(" ")[0], "pip_freeze": out}
@@ -180,10 +342,11 @@ def read_pyproject(root: Path) -> Tuple[str | None, str | None, List[str]]:
     name = version = None
     deps: List[str] = []
     pp = root / "pyproject.toml"
-    if not pp.exists() or tomllib is None:
+    if tomllib is None:
         return name, version, deps
     try:
-        data = tomllib.loads(pp.read_text(encoding="utf-8"))
+        with pp.open("rb") as f:  # tomllib.load tar bytes direkt; saknad fil fångas nedan
+            data = tomllib.load(f)
         proj = data.get("project", {})
         name = proj.get("name")
         version = proj.get("version")
@@ -195,37 +358,36 @@ def read_pyproject(root: Path) -> Tuple[str | None, str | None, List[str]]:
 
 def summarize_tree(root: Path, max_depth: int = 3, max_entries: int = 50) -> List[str]:
     lines: List[str] = []
+    cut = len(os.path.join(str(root), ""))
 
-    def walk(d: Path, depth: int) -> None:
+    def walk(d: str, depth: int) -> None:
         if depth > max_depth:
             return
-        rel = d.relative_to(root)
-        if rel.parts and rel.parts[0] in IGNORED_DIRS:
-            return
-        entries = []
+        # Ignorerade kataloger filtreras bort direkt ur scandir och besöks aldrig
         try:
-            entries = sorted(d.iterdir(), key=lambda p: (p.is_file(), p.name.lower()))
+            with os.scandir(d) as it:
+                entries = [(e.is_file(), e.name.lower(), e) for e in it if e.name not in IGNORED_DIRS]
         except Exception:
             return
+        entries.sort(key=lambda t: (t[0], t[1]))
         shown = 0
-        for p in entries:
-            if p.name in IGNORED_DIRS:
-                continue
-            if p.is_dir():
-                lines.append(f"{p.relative_to(root)}/")
+        for _, _, e in entries:
+            rel = e.path[cut:]
+            if e.is_dir():
+                lines.append(f"{rel}/")
                 shown += 1
                 if shown >= max_entries:
                     lines.append("…")
                     break
-                walk(p, depth + 1)
+                walk(e.path, depth + 1)
             else:
-                lines.append(str(p.relative_to(root)))
+                lines.append(rel)
                 shown += 1
                 if shown >= max_entries:
                     lines.append("…")
                     break
 
-    walk(root, 0)
+    walk(str(root), 0)
     return lines
 
 
@@ -237,13 +399,26 @@ def git_info(root: Path) -> Dict[str, Any]:
         except Exception:
             return None
 
-    info = {
-        "branch": run(["git", "rev-parse", "--abbrev-ref", "HEAD"]),
-        "commit": run(["git", "rev-parse", "HEAD"]),
-        "short": run(["git", "rev-parse", "--short", "HEAD"]),
-        "status": run(["git", "status", "--porcelain"]),
+    # HEAD/ref-info ändras bara när HEAD, index eller reflog skrivs; status speglar arbetskatalogen och cachas inte
+    git_dir = root / ".git"
+    key = _mtime_key(git_dir / "HEAD", git_dir / "index", git_dir / "logs" / "HEAD")
+
+    def cached(args: List[str]) -> str | None:
+        return _run_cached(tuple(args), key, str(root))
+
+    jobs = {
+        "branch": (cached, ["git", "rev-parse", "--abbrev-ref", "HEAD"]),
+        "commit": (cached, ["git", "rev-parse", "HEAD"]),
+        "short": (cached, ["git", "rev-parse", "--short", "HEAD"]),
+        "status": (run, ["git", "status", "--porcelain"]),
     }
-    return info
+    # Processerna väntar på I/O, så de kan köras samtidigt
+    with ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        futs = {k: ex.submit(fn, cmd) for k, (fn, cmd) in jobs.items()}
+        return {k: f.result() for k, f in futs.items()}
+
+
+STAT_TABLES = ("source", "document", "asset", "figure")
 
 
 def db_ping(dsn: str) -> Dict[str, Any]:
@@ -254,21 +429,34 @@ def db_ping(dsn: str) -> Dict[str, Any]:
             with conn.cursor() as cur:
                 cur.execute("select now()")
                 now = cur.fetchone()[0]
-                stats = {}
-                for tbl in ("source", "document", "asset", "figure"):
+                # Ungefärliga radantal ur pg_class (O(1)) i stället för count(*) = full scan per tabell
+                cur.execute(
+                    "select t, c.reltuples::bigint from unnest(%s::text[]) as t join pg_class c on c.oid = to_regclass(t)",
+                    (list(STAT_TABLES),),
+                )
+                rows = cur.fetchall()
+                stats: dict[str, int | None] = dict.fromkeys(STAT_TABLES)
+                estimated = {t: n for t, n in rows if n > 0}
+                stats.update(estimated)
+                # reltuples = -1 (aldrig analyserad) eller 0 (tom, eller oanalyserad före PG 14) – räkna exakt,
+                # alla i en fråga
+                unknown = [t for t, n in rows if n <= 0]
+                if unknown:
                     try:
-                        cur.execute(f"select count(*) from {tbl}")
-                        stats[tbl] = cur.fetchone()[0]
+                        cur.execute("select " + ", ".join(f"(select count(*) from {t})" for t in unknown))
+                        stats.update(zip(unknown, cur.fetchone()))
                     except Exception:
-                        stats[tbl] = None
-        return {"ok": True, "now": str(now), "stats": stats}
+                        pass
+        return {"ok": True, "now": str(now), "stats": stats, "stats_approximate": bool(estimated)}
     except Exception as e:  # pragma: no cover
         return {"ok": False, "error": str(e)}
 
 
+@functools.cache
 def which_python() -> str:
     return sys.executable
 
+@functools.cache
 def venv_active() -> bool:
     # Venv heuristik
     return bool(os.environ.get("VIRTUAL_ENV")) or (hasattr(sys, "base_prefix") and sys.prefix != getattr(sys, "base_prefix", sys.prefix))
@@ -281,90 +469,138 @@ def import_listedinc_info() -> dict:
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
-MAKE_TARGET_RE = re.compile(r"^([A-Za-z0-9_.-]+):\s*$")
+# Hela filen matchas i ett svep; motsvarar `^target:\s*$` per strippad rad
+MAKE_TARGET_RE = re.compile(rb"(?m)^[ \t]*([A-Za-z0-9_.\-]+):[ \t\r]*$")
 
 def read_make_targets(root: Path) -> list[str]:
     mk = root / "Makefile"
     if not mk.exists():
         return []
-    targets: list[str] = []
     try:
-        for line in mk.read_text(encoding="utf-8").splitlines():
-            m = MAKE_TARGET_RE.match(line.strip())
-            if m:
-                t = m.group(1)
-                # hoppa över inbyggda/privata
-                if t not in targets:
-                    targets.append(t)
+        data = mk.read_bytes()
     except Exception:
-        pass
-    return targets
+        return []
+    # dict.fromkeys: dedup med bevarad ordning
+    return list(dict.fromkeys(m.group(1).decode() for m in MAKE_TARGET_RE.finditer(data)))
 
 def brew_services_info() -> dict:
-    def run(args: list[str]) -> str | None:
-        try:
-            out = subprocess.check_output(args, stderr=subprocess.DEVNULL)
-            return out.decode().strip()
-        except Exception:
-            return None
     if not shutil.which("brew"):
         return {"ok": False, "error": "brew not found"}
-    info = run(["brew", "services", "list"]) or ""
+    # Tjänstestatus har inget filtillstånd att nyckla på – använd en kort TTL (30 s)
+    info = _run_cached(("brew", "services", "list"), (int(time.time() // 30),)) or ""
     lines = [line for line in info.splitlines() if "postgres" in line or "postgresql" in line]
     return {"ok": True, "list": lines}
 
 
-def build_snapshot(root: Path, max_depth: int, no_db: bool, show_make: bool, services: bool, topn: int) -> Dict[str, Any]:
-    name, version, deps = read_pyproject(root)
-    tree = summarize_tree(root, max_depth=max_depth)
-    files = {f: (root / f).exists() for f in KEY_FILES}
+def key_files(root: Path) -> dict[str, bool]:
+    # En scandir av roten ersätter en stat per nyckelfil; bara kandidater i underkataloger stat:as
+    try:
+        with os.scandir(root) as it:
+            top_names = {e.name for e in it}
+    except OSError:
+        top_names = set()
+    files = {f: (f in top_names) for f in KEY_FILES}
     # Normalisera schema.sql – räkna som OK om någon av kandidaterna finns
-    files["schema.sql"] = any((root / p).exists() for p in SCHEMA_CANDIDATES)
+    files["schema.sql"] = any(
+        (p in top_names) if os.sep not in p and "/" not in p else (root / p).exists() for p in SCHEMA_CANDIDATES
+    )
+    return files
+
+
+def parse_sections(value: str) -> frozenset[str]:
+    if value.strip() == "all":
+        return DEFAULT_SECTIONS
+    chosen = frozenset(v.strip() for v in value.split(",") if v.strip())
+    unknown = chosen - set(SECTIONS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"okända sektioner: {', '.join(sorted(unknown))} (välj bland {', '.join(SECTIONS)})")
+    return chosen
 
+
+def database_info(no_db: bool) -> Dict[str, Any]:
     dsn = os.getenv("DATABASE_URL")
-    db = {"ok": False, "error": "DB-test hoppades över"}
     if not no_db and dsn:
-        db = db_ping(dsn)
-    elif not dsn:
-        db = {"ok": False, "error": "DATABASE_URL not set"}
-
-    files_all = collect_files(root)
-    by_dir = per_dir_stats(root, files_all)
-    largest = largest_files(root, files_all, topn)
-    recent = recently_modified(root, files_all, topn)
-    pyinfo = python_info()
+        return db_ping(dsn)
+    if not dsn:
+        return {"ok": False, "error": "DATABASE_URL not set"}
+    return {"ok": False, "error": "DB-test hoppades över"}
+
+
+def build_snapshot(
+    root: Path,
+    max_depth: int,
+    no_db: bool,
+    show_make: bool,
+    services: bool,
+    topn: int,
+    sections: frozenset[str] = DEFAULT_SECTIONS,
+) -> Dict[str, Any]:
+    sections = set(sections)
+    if show_make:
+        sections.add("make")
+    if services:
+        sections.add("services")
+
+    # Sektionerna är oberoende (subprocess, nätverk, disk) – kör dem parallellt
+    jobs = {
+        "project": lambda: read_pyproject(root),
+        "files": lambda: key_files(root),
+        "git": lambda: git_info(root),
+        "tree": lambda: summarize_tree(root, max_depth=max_depth),
+        "db": lambda: database_info(no_db),
+        "scan": lambda: scan_tree(root, topn),
+        "python": python_info,
+        "make": lambda: read_make_targets(root),
+        "services": brew_services_info,
+    }
+    enabled = [k for k in SECTIONS if k in sections]
+    if enabled:
+        with ThreadPoolExecutor(max_workers=len(enabled)) as ex:
+            futures = {k: ex.submit(jobs[k]) for k in enabled}
+        res = {k: f.result() for k, f in futures.items()}
+    else:
+        res = {}
 
-    snap = {
+    dsn = os.getenv("DATABASE_URL")
+    snap: Dict[str, Any] = {
         "generated_at": dt.datetime.utcnow().isoformat() + "Z",
         "root": str(root),
         "python": sys.version.split()[0],
         "python_path": which_python(),
         "venv_active": venv_active(),
         "platform": platform.platform(),
-        "project": {
+    }
+    if "project" in res:
+        name, version, deps = res["project"]
+        snap["project"] = {
             "name": name,
             "version": version,
             "dependencies": deps,
-        },
-        "key_files": files,
-        "git": git_info(root),
-        "tree": tree,
-        "env": {
-            "DATA_ROOT": os.getenv("DATA_ROOT"),
-            "DATABASE_URL": redact_env(dsn) if dsn else None,
-            "PGSERVICE": os.getenv("PGSERVICE"),
-        },
-        "database": db,
-        "listedinc": import_listedinc_info(),
-        "by_dir": by_dir,
-        "largest": largest,
-        "recent": recent,
-        "python_info": pyinfo,
+        }
+    if "files" in res:
+        snap["key_files"] = res["files"]
+    if "git" in res:
+        snap["git"] = res["git"]
+    if "tree" in res:
+        snap["tree"] = res["tree"]
+    snap["env"] = {
+        "DATA_ROOT": os.getenv("DATA_ROOT"),
+        "DATABASE_URL": redact_env(dsn) if dsn else None,
+        "PGSERVICE": os.getenv("PGSERVICE"),
     }
-    if show_make:
-        snap["make_targets"] = read_make_targets(root)
-    if services:
-        snap["services"] = brew_services_info()
+    if "db" in res:
+        snap["database"] = res["db"]
+    snap["listedinc"] = import_listedinc_info()
+    if "scan" in res:
+        snap["by_dir"] = res["scan"]["by_dir"]
+        snap["largest"] = res["scan"]["largest"]
+        snap["recent"] = res["scan"]["recent"]
+    if "python" in res:
+        snap["python_info"] = res["python"]
+    if "make" in res:
+        snap["make_targets"] = res["make"]
+    if "services" in res:
+        snap["services"] = res["services"]
     return snap
 
 
@@ -386,20 +622,19 @@ def to_markdown(snap: Dict[str, Any]) -> str:
     deps = proj.get("dependencies") or []
     if deps:
         md.append("\n### Dependencies\n")
-        for d in deps:
-            md.append(f"- {d}")
+        md.extend(f"- {d}" for d in deps)
         md.append("")
 
-    md.append("\n## Nyckelfiler\n")
-    for k, v in files.items():
-        icon = "✅" if v else "❌"
-        md.append(f"- {icon} {k}")
+    if "key_files" in snap:
+        md.append("\n## Nyckelfiler\n")
+        md.extend(f"- {'✅' if v else '❌'} {k}" for k, v in files.items())
 
-    md.append("\n## Git\n")
-    md.append(f"- Branch: `{git.get('branch')}`")
-    md.append(f"- Commit: `{git.get('short')}`")
-    if git.get("status"):
-        md.append("- Ocommittade ändringar finns")
+    if "git" in snap:
+        md.append("\n## Git\n")
+        md.append(f"- Branch: `{git.get('branch')}`")
+        md.append(f"- Commit: `{git.get('short')}`")
+        if git.get("status"):
+            md.append("- Ocommittade ändringar finns")
 
     md.append("\n## Python/Env\n")
     md.append(f"- Python executable: `{snap.get('python_path')}`")
@@ -422,57 +657,53 @@ def to_markdown(snap: Dict[str, Any]) -> str:
 
     if "make_targets" in snap:
         md.append("\n## Make targets\n")
-        for t in snap["make_targets"]:
-            md.append(f"- {t}")
+        md.extend(f"- {t}" for t in snap["make_targets"])
 
     if "services" in snap:
         md.append("\n## Homebrew services (PostgreSQL)\n")
         services = snap["services"]
         if services.get("ok"):
             if services.get("list"):
-                for line in services["list"]:
-                    md.append(f"- {line}")
+                md.extend(f"- {line}" for line in services["list"])
             else:
                 md.append("- Inga PostgreSQL-tjänster hittades")
         else:
             md.append(f"- Fel: {services.get('error')}")
 
-    md.append("\n## Katalogstruktur (kort)\n")
-    for line in snap.get("tree", [])[:200]:
-        md.append(f"- {line}")
-
-    md.append("\n## Per katalog (toppnivå)")
-    md.append("```")
-    for row in snap.get("by_dir", []) or []:
-        md.append(f"{row['path']}: files={row['files']}, lines={row['lines']}, bytes={row['bytes']}")
-    md.append("```")
-
-    md.append("\n## Största filer")
-    md.append("```")
-    for row in snap.get("largest", []) or []:
-        md.append(f"{row['path']} — {row['bytes']} bytes")
-    md.append("```")
-
-    md.append("\n## Senast ändrade")
-    md.append("```")
-    for row in snap.get("recent", []) or []:
-        md.append(f"{row['mtime']}  {row['path']}")
-    md.append("```")
-
-    db = snap.get("database") or {}
-    md.append("\n## Databas\n")
-    if db.get("ok"):
-        md.append(f"- ✅ Anslutning OK, now(): {db.get('now')}")
-        stats = db.get("stats")
-        if stats:
-            md.append("- Tabellräkningar:")
-            for tbl, cnt in stats.items():
-                if cnt is None:
-                    md.append(f"  - {tbl}: ❌ kunde inte läsa")
+    if "tree" in snap:
+        md.append("\n## Katalogstruktur (kort)\n")
+        md.extend(f"- {line}" for line in snap.get("tree", [])[:200])
+
+    if "by_dir" in snap:
+        md.append("\n## Per katalog (toppnivå)")
+        md.append("```")
+        md.extend(f"{row['path']}: files={row['files']}, lines={row['lines']}, bytes={row['bytes']}" for row in snap.get("by_dir", []) or [])
+        md.append("```")
+
+        md.append("\n## Största filer")
+        md.append("```")
+        md.extend(f"{row['path']} — {row['bytes']} bytes" for row in snap.get("largest", []) or [])
+        md.append("```")
+
+        md.append("\n## Senast ändrade")
+        md.append("```")
+        md.extend(f"{row['mtime']}  {row['path']}" for row in snap.get("recent", []) or [])
+        md.append("```")
+
+    if "database" in snap:
+        db = snap.get("database") or {}
+        md.append("\n## Databas\n")
+        if db.get("ok"):
+            md.append(f"- ✅ Anslutning OK, now(): {db.get('now')}")
+            stats = db.get("stats")
+            if stats:
+                if db.get("stats_approximate"):
+                    md.append("- Tabellräkningar (ungefärliga, pg_class.reltuples):")
                 else:
-                    md.append(f"  - {tbl}: {cnt}")
-    else:
-        md.append(f"- ❌ DB: {db.get('error')}")
+                    md.append("- Tabellräkningar:")
+                md.extend(f"  - {tbl}: ❌ kunde inte läsa" if cnt is None else f"  - {tbl}: {cnt}" for tbl, cnt in stats.items())
+        else:
+            md.append(f"- ❌ DB: {db.get('error')}")
 
     md.append("")
     return "\n".join(md)
@@ -487,15 +718,26 @@ def main() -> None:
     ap.add_argument("--no-db", action="store_true")
     ap.add_argument("--show-make", action="store_true")
     ap.add_argument("--services", action="store_true")
+    ap.add_argument(
+        "--sections",
+        type=parse_sections,
+        default=DEFAULT_SECTIONS,
+        help=f"Kommaseparerad lista av sektioner ({','.join(SECTIONS)}) eller 'all'",
+    )
     args = ap.parse_args()
 
     root = Path(__file__).resolve().parent
     topn = args.topn
-    snap = build_snapshot(root, max_depth=args.max_depth, no_db=args.no_db, show_make=args.show_make, services=args.services, topn=topn)
+    snap = build_snapshot(root, max_depth=args.max_depth, no_db=args.no_db, show_make=args.show_make, services=args.services, topn=topn, sections=args.sections)
+
+    save_run_cache()
 
     md = to_markdown(snap)
     Path(args.md).write_text(md, encoding="utf-8")
-    Path(args.json).write_text(json.dumps(snap, indent=2, ensure_ascii=False), encoding="utf-8")
+    if orjson is not None:
+        Path(args.json).write_bytes(orjson.dumps(snap, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        Path(args.json).write_text(json.dumps(snap, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
 
     print(f"Snapshot skriven till {args.md} och {args.json}")
 
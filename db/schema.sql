@@ -109,7 +109,8 @@ CREATE TABLE IF NOT EXISTS file_object (
   mtime         TIMESTAMPTZ NOT NULL,
   ctime         TIMESTAMPTZ,
   content_type  TEXT,
-  checksum_sha256 TEXT NOT NULL,
+  checksum_sha256 TEXT,
+  checksum_blake3 TEXT,
   version_num   INT NOT NULL DEFAULT 1,
   is_current    BOOLEAN NOT NULL DEFAULT TRUE,
   is_deleted    BOOLEAN NOT NULL DEFAULT FALSE,
@@ -119,6 +120,10 @@ CREATE TABLE IF NOT EXISTS file_object (
   UNIQUE (directory_id, name, version_num)
 );
 
+-- BLAKE3 (LISTEDINC_HASH=blake3) lagras i egen kolumn; checksum_sha256 är då NULL (idempotent)
+ALTER TABLE file_object ADD COLUMN IF NOT EXISTS checksum_blake3 TEXT;
+ALTER TABLE file_object ALTER COLUMN checksum_sha256 DROP NOT NULL;
+
 CREATE TABLE IF NOT EXISTS file_link (
   file_id     UUID REFERENCES file_object(id) ON DELETE CASCADE,
   document_id UUID REFERENCES document(id) ON DELETE CASCADE,
@@ -133,6 +138,7 @@ CREATE INDEX IF NOT EXISTS idx_document_text
 
 CREATE INDEX IF NOT EXISTS idx_figure_key ON figure (metric_key, period_end);
 CREATE INDEX IF NOT EXISTS idx_file_checksum ON file_object(checksum_sha256);
+CREATE INDEX IF NOT EXISTS idx_file_checksum_blake3 ON file_object(checksum_blake3);
 CREATE INDEX IF NOT EXISTS idx_file_dir_name ON file_object(directory_id, name) WHERE is_current AND NOT is_deleted;
 
 -- ====== Hjälp- och upsert-funktioner ======
@@ -154,31 +160,47 @@ BEGIN
   WHERE directory_id=did AND name=fname AND is_current=TRUE AND is_deleted=FALSE;
 END; $$ LANGUAGE plpgsql;
 
+-- Äldre signatur utan kategori; tas bort så att anrop med 7 argument inte blir tvetydiga
+DROP FUNCTION IF EXISTS upsert_file_object(UUID, TEXT, TEXT, BIGINT, TIMESTAMPTZ, TEXT, TEXT);
+-- Äldre signatur utan blake3
+DROP FUNCTION IF EXISTS upsert_file_object(UUID, TEXT, TEXT, BIGINT, TIMESTAMPTZ, TEXT, TEXT, TEXT);
+
 CREATE OR REPLACE FUNCTION upsert_file_object(
-  did UUID, fname TEXT, ext TEXT, sz BIGINT, m TIMESTAMPTZ, ctype TEXT, sha TEXT
+  did UUID, fname TEXT, ext TEXT, sz BIGINT, m TIMESTAMPTZ, ctype TEXT, sha TEXT, cat TEXT DEFAULT NULL,
+  b3 TEXT DEFAULT NULL
 ) RETURNS UUID AS $$
-DECLARE fid UUID; prev_sha TEXT; prev_ver INT;
+DECLARE fid UUID; prev_sha TEXT; prev_b3 TEXT; prev_sz BIGINT; prev_m TIMESTAMPTZ; prev_ver INT; same BOOLEAN;
 BEGIN
-  SELECT id, checksum_sha256, version_num INTO fid, prev_sha, prev_ver
+  SELECT id, checksum_sha256, checksum_blake3, size_bytes, mtime, version_num
+    INTO fid, prev_sha, prev_b3, prev_sz, prev_m, prev_ver
   FROM file_object
   WHERE directory_id=did AND name=fname AND is_current=TRUE AND is_deleted=FALSE
   ORDER BY version_num DESC LIMIT 1;
 
   IF fid IS NULL THEN
-    INSERT INTO file_object(directory_id, name, ext, size_bytes, mtime, content_type, checksum_sha256, version_num)
-    VALUES (did, fname, ext, sz, m, ctype, sha, 1)
+    INSERT INTO file_object(directory_id, name, ext, size_bytes, mtime, content_type, checksum_sha256, checksum_blake3, version_num, category)
+    VALUES (did, fname, ext, sz, m, ctype, sha, b3, 1, cat)
     RETURNING id INTO fid;
     RETURN fid;
   END IF;
 
-  IF prev_sha = sha THEN
-    UPDATE file_object SET size_bytes=sz, mtime=m, content_type=ctype, updated_at=now()
+  -- jämför på en hash som finns på båda sidor; saknas en gemensam (bytt LISTEDINC_HASH)
+  -- räknas filen som oförändrad om storlek och mtime är desamma, och den nya hashen fylls i
+  same := CASE
+    WHEN sha IS NOT NULL AND prev_sha IS NOT NULL THEN prev_sha = sha
+    WHEN b3 IS NOT NULL AND prev_b3 IS NOT NULL THEN prev_b3 = b3
+    ELSE prev_sz = sz AND prev_m = m
+  END;
+
+  IF same THEN
+    UPDATE file_object SET size_bytes=sz, mtime=m, content_type=ctype, category=COALESCE(cat, category),
+           checksum_sha256=COALESCE(sha, checksum_sha256), checksum_blake3=COALESCE(b3, checksum_blake3), updated_at=now()
     WHERE id=fid;
     RETURN fid;
   ELSE
     PERFORM fileobject_demote_previous(did, fname);
-    INSERT INTO file_object(directory_id, name, ext, size_bytes, mtime, content_type, checksum_sha256, version_num)
-    VALUES (did, fname, ext, sz, m, ctype, sha, prev_ver+1)
+    INSERT INTO file_object(directory_id, name, ext, size_bytes, mtime, content_type, checksum_sha256, checksum_blake3, version_num, category)
+    VALUES (did, fname, ext, sz, m, ctype, sha, b3, prev_ver+1, cat)
     RETURNING id INTO fid;
     RETURN fid;
   END IF;
@@ -1,17 +1,30 @@
 import argparse
+import asyncio
+import functools
+import hashlib
 import os
 import re
 import sys
 import time
 import urllib.robotparser as robotparser
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse, urlunparse
 
 import httpx
+from psycopg_pool import ConnectionPool
 from bs4 import BeautifulSoup
 import xml.etree.ElementTree as ET
 from typing import Optional
 
-from listedinc.ingest_url import ingest_one
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except Exception:
+    LexborHTMLParser = None
+
+from listedinc.ingest_url import MAX_BODY_BYTES, BodyTooLarge, content_length_exceeds, ingest_content
+
+USER_AGENT = "listedinc-crawler/0.1"
 
 def _short(x) -> str:
     try:
@@ -41,6 +54,12 @@ def toggle_www(u: str) -> str:
 
 
 
+# Snabbväg för absoluta, "vanliga" http(s)-URL:er: ASCII, utan blanksteg, ;-params eller []-värdar.
+# Ger exakt samma resultat som urlparse/urlunparse-vägen nedan.
+_ABS_URL_RE = re.compile(r"(https?)://([^/?#\s\[\]]+)((?:/[^?#;\s]*)?)(?:\?([^#\s]*))?(?:#\S*)?")
+
+
+@functools.lru_cache(maxsize=10_000)
 def normalize_url(u: str, base: str | None = None) -> Optional[str]:
     """Resolve relative URL, drop fragments, normalise scheme/host, trim trailing slash (except root).
     Returns a canonical http(s) URL or None if non-http(s).
@@ -48,6 +67,14 @@ def normalize_url(u: str, base: str | None = None) -> Optional[str]:
     try:
         if base:
             u = urljoin(base, u)
+        m = _ABS_URL_RE.fullmatch(u) if u.isascii() else None
+        if m:
+            scheme, netloc, path, query = m.groups()
+            netloc = netloc.lower()
+            path = path or "/"
+            if path != "/" and path.endswith("/"):
+                path = path.rstrip("/")
+            return f"{scheme}://{netloc}{path}?{query}" if query else f"{scheme}://{netloc}{path}"
         p = urlparse(u)
         if p.scheme not in ("http", "https"):
             return None
@@ -75,57 +102,123 @@ def unique_preserve(seq):
     return out
 
 
-def build_robots(start_url: str, verify, timeout=10):
+class SeenUrls:
+    """Kompakt besöksmängd: sparar bara hash(url) i stället för hela URL-strängen.
+    En hash-kollision innebär i värsta fall att en URL hoppas över som dubblett."""
+
+    __slots__ = ("_hashes",)
+
+    def __init__(self):
+        self._hashes: set[int] = set()
+
+    def __contains__(self, u: str) -> bool:
+        return hash(u) in self._hashes
+
+    def add(self, u: str) -> None:
+        self._hashes.add(hash(u))
+
+    def discard(self, u: str) -> None:
+        self._hashes.discard(hash(u))
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+def build_robots(client: httpx.Client, start_url: str, timeout=10):
     """Return a robotparser.RobotFileParser or None if fetch fails."""
     try:
         base = f"{urlparse(start_url).scheme}://{urlparse(start_url).netloc}"
         robots_url = urljoin(base, "/robots.txt")
-        with httpx.Client(follow_redirects=True, timeout=timeout, verify=verify, headers={"User-Agent": "listedinc-crawler/0.1"}) as c:
-            r = c.get(robots_url)
-            if r.status_code >= 400 or not r.content:
-                return None
-            rp = robotparser.RobotFileParser()
-            rp.set_url(robots_url)
-            rp.parse(r.text.splitlines())
-            return rp
+        r = client.get(robots_url, timeout=timeout)
+        if r.status_code >= 400 or not r.content:
+            return None
+        rp = robotparser.RobotFileParser()
+        rp.set_url(robots_url)
+        rp.parse(r.text.splitlines())
+        return rp
     except Exception:
         return None
 
 
-def fetch_sitemap(start_url: str, verify, timeout=15):
+# robots.txt per värd (scheme://netloc) -> (parser eller None, hämtad vid time.monotonic())
+_robots_cache: dict[str, tuple[robotparser.RobotFileParser | None, float]] = {}
+ROBOTS_TTL = 6 * 3600
+
+
+def _robots_key(u: str) -> str:
+    p = urlparse(u)
+    return f"{p.scheme}://{p.netloc}"
+
+
+def robots_cached(u: str) -> bool:
+    hit = _robots_cache.get(_robots_key(u))
+    return hit is not None and time.monotonic() - hit[1] < ROBOTS_TTL
+
+
+def robots_for(client: httpx.Client, u: str):
+    """Return the (cached) RobotFileParser for u's host, fetching on miss or after ROBOTS_TTL."""
+    key = _robots_key(u)
+    hit = _robots_cache.get(key)
+    now = time.monotonic()
+    if hit is not None and now - hit[1] < ROBOTS_TTL:
+        return hit[0]
+    rp = build_robots(client, key)
+    _robots_cache[key] = (rp, now)
+    return rp
+
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+SITEMAP_LOC = SITEMAP_NS + "loc"
+SITEMAP_SITEMAP = SITEMAP_NS + "sitemap"
+SITEMAP_INDEX = SITEMAP_NS + "sitemapindex"
+
+
+def _stream_sitemap(client: httpx.Client, url: str, timeout=15) -> tuple[list[str], list[str]]:
+    """Strömma en sitemap genom XMLPullParser och returnera (alla <loc>, <loc> under <sitemap>).
+    Inget fullständigt träd byggs; färdiga element töms direkt."""
+    locs, index_locs = [], []
+    with client.stream("GET", url, timeout=timeout) as r:
+        if r.status_code >= 400:
+            return locs, index_locs
+        parser = ET.XMLPullParser(events=("start", "end"))
+        stack = []
+        is_index = None  # avgörs av rotelementet: bara <sitemapindex> har under-sitemaps
+        try:
+            for chunk in r.iter_bytes():
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        if is_index is None:
+                            is_index = elem.tag == SITEMAP_INDEX
+                        stack.append(elem.tag)
+                        continue
+                    stack.pop()
+                    if elem.tag == SITEMAP_LOC and elem.text:
+                        loc = elem.text.strip()
+                        locs.append(loc)
+                        if is_index and stack and stack[-1] == SITEMAP_SITEMAP:
+                            index_locs.append(loc)
+                    elem.clear()
+        except ET.ParseError:
+            pass  # best-effort: behåll det som hann tolkas
+    return locs, index_locs
+
+
+def fetch_sitemap(client: httpx.Client, start_url: str, timeout=15):
     """Return a list of URLs from /sitemap.xml (best-effort), else empty list."""
     try:
         base = f"{urlparse(start_url).scheme}://{urlparse(start_url).netloc}"
         sm_url = urljoin(base, "/sitemap.xml")
-        with httpx.Client(follow_redirects=True, timeout=timeout, verify=verify, headers={"User-Agent": "listedinc-crawler/0.1"}) as c:
-            r = c.get(sm_url)
-            if r.status_code >= 400 or not r.content:
-                return []
+        # urlset/loc (och sitemapindex/sitemap/loc)
+        urls, index_locs = _stream_sitemap(client, sm_url, timeout=timeout)
+        # handle sitemap index (sitemapindex/sitemap/loc) by shallow fetch
+        for u in index_locs:
             try:
-                root = ET.fromstring(r.content)
+                sub, _ = _stream_sitemap(client, u, timeout=timeout)
+                urls.extend(sub)
             except Exception:
-                return []
-            urls = []
-            # urlset/loc
-            for loc in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc'):
-                if loc.text:
-                    urls.append(loc.text.strip())
-            # handle sitemap index (sitemapindex/sitemap/loc) by shallow fetch
-            for sm_loc in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap/{http://www.sitemaps.org/schemas/sitemap/0.9}loc'):
-                try:
-                    u = sm_loc.text.strip()
-                    rr = c.get(u)
-                    if rr.status_code < 400 and rr.content:
-                        try:
-                            sub = ET.fromstring(rr.content)
-                            for loc in sub.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc'):
-                                if loc.text:
-                                    urls.append(loc.text.strip())
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-            return urls
+                pass
+        return urls
     except Exception:
         return []
 
@@ -163,11 +256,29 @@ def hosts_from_urls(urls: list[str]) -> list[str]:
 
 IR_HOST_RE = re.compile(r"^(invest(or|ors)?|ir|financial|finance|reports?|news|press|corporate)\.", re.I)
 
-def discover_ir_hosts(start_url: str, verify, timeout=10) -> list[str]:
+async def probe_urls_async(urls: list[str], verify, timeout=5) -> list[str]:
+    """Returnera de URL:er som svarar med status < 400, provade parallellt.
+    HEAD används för att slippa hämta body; GET om servern inte stöder HEAD (405/501)."""
+    async def probe(c: httpx.AsyncClient, u: str) -> int:
+        r = await c.head(u)
+        if r.status_code in (405, 501):
+            r = await c.get(u)
+        return r.status_code
+
+    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout, verify=verify, headers={"User-Agent": USER_AGENT}, http2=True) as c:
+        results = await asyncio.gather(*(probe(c, u) for u in urls), return_exceptions=True)
+    return [u for u, st in zip(urls, results) if not isinstance(st, BaseException) and st < 400]
+
+
+def discover_ir_hosts(client: httpx.Client, start_url: str, timeout=10, verify=True) -> list[str]:
     """Heuristiskt: hämta startsida + sitemap, samla länkar, plocka värdar som ser ut som IR-domäner.
     Returnerar lista med bas-URL:er (https://host/)."""
+    # startsida och sitemap är oberoende – hämta dem samtidigt (httpx.Client är trådsäker)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        page_f = pool.submit(fetch_bytes, client, start_url, timeout=timeout, retries=1)
+        sm_f = pool.submit(fetch_sitemap, client, start_url, timeout=timeout)
     try:
-        status, ctype, body = fetch_bytes(start_url, verify, timeout=timeout, retries=1)
+        status, ctype, body = page_f.result()
     except Exception:
         body = b""
     urls = []
@@ -177,7 +288,7 @@ def discover_ir_hosts(start_url: str, verify, timeout=10) -> list[str]:
         except Exception:
             pass
     try:
-        sm = fetch_sitemap(start_url, verify, timeout=timeout)
+        sm = sm_f.result()
         urls.extend(sm)
     except Exception:
         pass
@@ -195,18 +306,14 @@ def discover_ir_hosts(start_url: str, verify, timeout=10) -> list[str]:
     # Håll även koll på investor.<base_host>, corporate.<base_host>, ir.<base_host> och financial.<base_host>
     for prefix in ("investor.", "corporate.", "ir.", "financial."):
         candidates.append(prefix + base_host)
-    out = []
-    for h in unique_preserve(candidates):
-        try:
-            u = f"https://{h}/"
-            st, _, _ = fetch_bytes(u, verify, timeout=5, retries=1)
-            if st < 400:
-                out.append(u)
-        except Exception:
-            continue
+    probe = [f"https://{h}/" for h in unique_preserve(candidates)]
+    try:
+        out = asyncio.run(probe_urls_async(probe, verify, timeout=5))
+    except Exception:
+        out = []
     return unique_preserve(out)
 
-def guess_investor_subdomain(start_url: str, verify, timeout=10):
+def guess_investor_subdomain(client: httpx.Client, start_url: str, timeout=10):
     """Return a likely IR subdomain URL if reachable (status < 400).
     Tries, in order: investor., corporate., ir., financial.
     Examples: https://company.se -> https://investor.company.se/
@@ -220,30 +327,84 @@ def guess_investor_subdomain(start_url: str, verify, timeout=10):
         if host.startswith("www."):
             host = host[4:]
         prefixes = ("investor.", "corporate.", "ir.", "financial.")
-        for pref in prefixes:
-            candidate = f"{p.scheme or 'https'}://{pref}{host}/"
-            status, ctype, body = fetch_bytes(candidate, verify, timeout=timeout, retries=1)
-            if status and status < 400:
-                return candidate
+        candidates = [f"{p.scheme or 'https'}://{pref}{host}/" for pref in prefixes]
+
+        def reachable(candidate: str) -> bool:
+            try:
+                status, ctype, body = fetch_bytes(client, candidate, timeout=timeout, retries=1)
+            except Exception:
+                return False
+            return bool(status and status < 400)
+
+        # prova alla samtidigt, men välj den första nåbara i prioritetsordning
+        with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+            for candidate, ok in zip(candidates, pool.map(reachable, candidates)):
+                if ok:
+                    return candidate
     except Exception:
         return None
     return None
 
 
+# Bakåtreferenser (\1, (?P=namn)) tål inte att mönster slås ihop – gruppnumren förskjuts
+_BACKREF_RE = re.compile(r"\\\d|\(\?P=")
+
+
+def any_matcher(patterns: list[str]):
+    """Return a predicate s -> bool that is true if any pattern matches (case-insensitive), or None.
+    The patterns are merged into one alternation so each string is scanned once."""
+    if not patterns:
+        return None
+    if not any(_BACKREF_RE.search(p) for p in patterns):
+        try:
+            combined = re.compile("|".join(f"(?:{p})" for p in patterns), re.I)
+            return lambda s: combined.search(s) is not None
+        except re.error:
+            pass  # t.ex. inline-flaggor mitt i – matcha mönstren var för sig
+    compiled = [re.compile(p, re.I) for p in patterns]
+    return lambda s: any(r.search(s) for r in compiled)
+
+
 IR_HINTS = re.compile(r"(invest(or|ment)s?|ir|financial|reports?|press|news|media|del[aå]rs|arsredovisning|annual|interim|report)", re.I)
 
 
+_HOST_RE = re.compile(r"https?://([^/:?#\s]+)(?=[/:?#]|$)")
+
+
+def host_of(u: str) -> str:
+    """Värdnamn utan port, gemener. Regex för vanliga http(s)-URL:er, annars urlparse."""
+    m = _HOST_RE.match(u)
+    if m:
+        return m.group(1).lower()
+    return (urlparse(u).netloc or "").split(":")[0].lower()
+
+
 def same_site(a: str, b: str) -> bool:
-    pa, pb = urlparse(a), urlparse(b)
-    return (pa.netloc or "").split(":")[0].lower() == (pb.netloc or "").split(":")[0].lower()
+    return host_of(a) == host_of(b)
 
 
-def discover_links(base_url: str, html_bytes: bytes, max_links: int = 500):
+# Ändelser som aldrig är värda att hämta (PDF ingår inte och släpps alltid igenom)
+_SKIP_EXTS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".zip", ".gz", ".tar", ".7z", ".mp4", ".mp3", ".mov"})
+
+
+def _iter_hrefs(html_bytes: bytes):
+    """Yield href-värden för alla <a>. selectolax (Lexbor) om installerat, annars BeautifulSoup."""
+    if LexborHTMLParser is not None:
+        try:
+            hrefs = [node.attributes.get("href") for node in LexborHTMLParser(html_bytes).css("a[href]")]
+        except Exception:
+            hrefs = None  # trasig sida – prova BS4 nedan
+        if hrefs is not None:
+            yield from hrefs
+            return
     soup = BeautifulSoup(html_bytes.decode("utf-8", errors="ignore"), "lxml")
-    skip_ext = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".zip", ".gz", ".tar", ".7z", ".mp4", ".mp3", ".mov")
+    for a in soup.find_all("a", href=True):
+        yield a["href"]
+
+
+def discover_links(base_url: str, html_bytes: bytes, max_links: int = 500):
     out = []
-    for a in soup.find_all("a"):
-        href = a.get("href")
+    for href in _iter_hrefs(html_bytes):
         if not href:
             continue
         if href.startswith("mailto:") or href.startswith("tel:"):
@@ -251,8 +412,9 @@ def discover_links(base_url: str, html_bytes: bytes, max_links: int = 500):
         nu = normalize_url(href, base_url)
         if not nu:
             continue
-        low = nu.lower()
-        if not low.endswith(".pdf") and any(low.endswith(ext) for ext in skip_ext):
+        # en hash-uppslagning på sista ".suffix" i stället för endswith per ändelse
+        suffix = nu.rpartition(".")[2].lower()
+        if "." + suffix in _SKIP_EXTS:
             continue
         out.append(nu)
         if len(out) >= max_links:
@@ -260,13 +422,11 @@ def discover_links(base_url: str, html_bytes: bytes, max_links: int = 500):
     return out
 
 
-def fetch_bytes(url: str, verify, timeout=30, retries=3):
+def fetch(client: httpx.Client, url: str, timeout=30, retries=3) -> httpx.Response:
     last = None
     for i in range(retries):
         try:
-            with httpx.Client(follow_redirects=True, timeout=timeout, verify=verify, headers={"User-Agent": "listedinc-crawler/0.1"}) as c:
-                r = c.get(url)
-                return r.status_code, r.headers.get("Content-Type"), r.content
+            return client.get(url, timeout=timeout)
         except Exception as e:
             last = e
             time.sleep(min(1.0 * (2 ** i), 4.0))
@@ -274,12 +434,49 @@ def fetch_bytes(url: str, verify, timeout=30, retries=3):
         raise last
 
 
+def fetch_bytes(client: httpx.Client, url: str, timeout=30, retries=3):
+    r = fetch(client, url, timeout=timeout, retries=retries)
+    return r.status_code, r.headers.get("Content-Type"), r.content
+
+
+async def _stream_hashed_async(client: httpx.AsyncClient, url: str, max_bytes: int) -> tuple[httpx.Response, bytes, str]:
+    async with client.stream("GET", url) as r:
+        if content_length_exceeds(r, max_bytes):
+            raise BodyTooLarge(f"{url}: Content-Length > {max_bytes} bytes")
+        h = hashlib.sha256()
+        chunks = []
+        size = 0
+        async for chunk in r.aiter_bytes(65536):
+            size += len(chunk)
+            if size > max_bytes:
+                raise BodyTooLarge(f"{url}: body > {max_bytes} bytes")
+            h.update(chunk)
+            chunks.append(chunk)
+    return r, b"".join(chunks), h.hexdigest()
+
+
+async def fetch_async(client: httpx.AsyncClient, url: str, retries=3, max_bytes: int = MAX_BODY_BYTES) -> tuple[httpx.Response, bytes, str]:
+    """Strömmad GET: returnerar (response, body, sha256). För stora bodies avbryts utan omförsök."""
+    last = None
+    for i in range(retries):
+        try:
+            return await _stream_hashed_async(client, url, max_bytes)
+        except BodyTooLarge:
+            raise
+        except Exception as e:
+            last = e
+            await asyncio.sleep(min(1.0 * (2 ** i), 4.0))
+    if last:
+        raise last
+
+
 def main():
     ap = argparse.ArgumentParser(description="Crawla en sajt och ingest:a sidor/PDF:er")
     ap.add_argument("--url", required=True, help="Start-URL (t.ex. https://www.kaklemax.se)")
     ap.add_argument("--max-pages", type=int, default=60, help="Max antal sidor att hämta")
     ap.add_argument("--max-depth", type=int, default=3, help="Max länkdjup (0=start-url)")
     ap.add_argument("--sleep", type=float, default=0.3, help="Paus mellan requests (sek)")
+    ap.add_argument("--concurrency", type=int, default=4, help="Antal parallella crawl-workers (default 4)")
     ap.add_argument("--insecure", action="store_true", help="Disable TLS verification")
     ap.add_argument("--ca-bundle", type=str, default=None, help="Path till custom CA bundle (PEM)")
     ap.add_argument("--pdf-to-db", action="store_true", help="Lagra PDF i DB (blob_store)")
@@ -312,32 +509,45 @@ def main():
     else:
         verify = True
 
-    include_res = [re.compile(p, re.I) for p in (args.include or [])]
-    exclude_res = [re.compile(p, re.I) for p in (args.exclude or [])]
-    allowed_host_res = [re.compile(p, re.I) for p in (args.allowed_hosts or [])]
+    include_any = any_matcher(args.include)
+    exclude_any = any_matcher(args.exclude)
+    allowed_host_any = any_matcher(args.allowed_hosts)
 
     def passes_filters(u: str) -> bool:
-        if include_res and not any(r.search(u) for r in include_res):
+        if include_any and not include_any(u):
             return False
-        if exclude_res and any(r.search(u) for r in exclude_res):
+        if exclude_any and exclude_any(u):
             return False
         return True
 
     def host_allowed(u: str) -> bool:
-        if not allowed_host_res:
+        if not allowed_host_any:
             return True
         try:
             h = urlparse(u).netloc
         except Exception:
             return False
-        return any(r.search(h) for r in allowed_host_res)
-
-    robots = build_robots(args.url, verify)  # kan vara None
-    def allowed(u: str) -> bool:
+        return allowed_host_any(h)
+
+    # En delad klient för robots, sitemap och IR-värdar – återanvänder anslutningar
+    client = httpx.Client(
+        follow_redirects=True,
+        timeout=30,
+        verify=verify,
+        headers={"User-Agent": USER_AGENT},
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32),
+    )
+
+    def allowed(u: str, fetch: bool = True) -> bool:
+        # fetch=False: okänd värd avgörs först när URL:en plockas ur kön
+        if not fetch and not robots_cached(u):
+            return True
+        robots = robots_for(client, u)  # kan vara None
         if robots is None:
             return True
         try:
-            return robots.can_fetch("listedinc-crawler/0.1", u)
+            return robots.can_fetch(USER_AGENT, u)
         except Exception:
             return True
 
@@ -352,7 +562,7 @@ def main():
     try:
         host = urlparse(start).netloc
         if host and not host.startswith("investor."):
-            inv_url = guess_investor_subdomain(start, verify)
+            inv_url = guess_investor_subdomain(client, start)
             if inv_url:
                 if args.verbose:
                     print(f"[INFO] investor-subdomän hittad: {inv_url} (byter startpunkt)")
@@ -364,7 +574,7 @@ def main():
     ir_seeds = []
     if args.discover_ir_hosts:
         try:
-            ir_candidates = discover_ir_hosts(start, verify)
+            ir_candidates = discover_ir_hosts(client, start, verify=verify)
             if args.verbose:
                 print(f"[INFO] IR-värdar funna: {ir_candidates}")
             # begränsa hur många vi lägger till
@@ -375,42 +585,59 @@ def main():
             pass
 
     # Initiera set/queue innan auto-seed använder dem
-    seen = set()
-    seen_norm = set()
-    queue = [(start, 0)]
+    seen_norm = SeenUrls()
+    start_host = host_of(start)  # räknas om bara när start byts
+    fetched = 0  # ingest:ade sidor; --max-pages är taket
+    in_flight = 0  # sidor som hämtas just nu och räknas mot taket
+
+    def admit(u: str | None, ignore_filters: bool = False) -> bool:
+        """Alla urvalsregler på ett ställe; körs en gång när URL:en köas (u är redan normaliserad)."""
+        if not u or u in seen_norm or fetched >= args.max_pages:
+            return False
+        if (not args.allow_external) and host_of(u) != start_host:
+            reason = "external"
+        elif not allowed(u, fetch=False):
+            reason = "robots"
+        elif not ignore_filters and not passes_filters(u):
+            reason = "filter"
+        elif not host_allowed(u):
+            reason = "host"
+        else:
+            return True
+        if args.verbose:
+            print(f"[SKIP {reason}] {u}")
+        return False
+
+    def entry(u: str, d: int) -> tuple[str, int, bool]:
+        # tredje fältet: robots redan prövad vid köning (värden fanns i cachen)
+        return (u, d, robots_cached(u))
+
+    queue = deque()
     if ir_seeds:
-        queue[0:0] = [(u, 0) for u in ir_seeds]
+        queue.extendleft(reversed([entry(u, 0) for u in ir_seeds if admit(u)]))
 
     # Auto-seed välkända IR/press-stigar
     seeded = []
     if args.auto_seed:
         seeds = build_seeds(start)
-        for u in seeds:
-            if u in seen_norm:
-                continue
-            if (not args.allow_external) and not same_site(start, u):
-                continue
-            if not allowed(u):
-                continue
-            if not args.seed_ignore_filters and not passes_filters(u):
-                continue
-            seeded.append(u)
+        seeded = [u for u in seeds if admit(u, ignore_filters=args.seed_ignore_filters)]
         if args.verbose:
             print(f"[INFO] auto-seed: {len(seeded)} länkar")
-        queue.extend((u, 1) for u in seeded)
+        queue.extend(entry(u, 1) for u in seeded)
 
     # 1) Hämta och ingest:a startsidan
     try:
-        status, ctype, body = fetch_bytes(start, verify)
+        resp = fetch(client, start)
     except Exception as e:
         # DNS-fallback: prova att toggla www.
         alt = toggle_www(start)
         if alt != start:
             try:
-                status, ctype, body = fetch_bytes(alt, verify)
+                resp = fetch(client, alt)
                 print(f"[INFO] start-URL misslyckades, provar {alt} istället")
                 start = alt
-                queue = [(start, 0)]
+                start_host = host_of(start)
+                queue.clear()
             except Exception as e2:
                 print(f"[FAIL] start: {start} -> {e2}", file=sys.stderr)
                 sys.exit(1)
@@ -418,93 +645,145 @@ def main():
             print(f"[FAIL] start: {start} -> {e}", file=sys.stderr)
             sys.exit(1)
 
+    # Anslutningspool för hela crawlen: workers (trådar) lånar en varm anslutning per ingest
+    pool = ConnectionPool(dsn, min_size=2, max_size=8, kwargs={"autocommit": True})
     try:
-        sid, did, st, ch = ingest_one(dsn, start, verify, pdf_to_db=args.pdf_to_db)
-        print(f"[OK d=0] {start} -> source={_short(sid)} doc={_short(did)} status={st}")
-        seen.add(start)
-        seen_norm.add(start)
-    except Exception as e:
-        print(f"[FAIL] ingest start: {start} -> {e}", file=sys.stderr)
-        sys.exit(1)
+        try:
+            # startsidan är redan hämtad – skicka samma bytes till ingest
+            body = resp.content
+            sid, did, st, ch = ingest_content(
+                dsn, start, body,
+                status=resp.status_code, content_type=resp.headers.get("Content-Type"), etag=resp.headers.get("ETag"),
+                pdf_to_db=args.pdf_to_db, pool=pool,
+            )
+            print(f"[OK d=0] {start} -> source={_short(sid)} doc={_short(did)} status={st}")
+            seen_norm.add(start)
+            fetched = 1
+        except Exception as e:
+            print(f"[FAIL] ingest start: {start} -> {e}", file=sys.stderr)
+            sys.exit(1)
 
-    if args.verbose and not args.use_sitemap:
-        print("[INFO] sitemap: hoppar över (använd --use-sitemap för att aktivera)")
+        if args.verbose and not args.use_sitemap:
+            print("[INFO] sitemap: hoppar över (använd --use-sitemap för att aktivera)")
 
-    # 2a) Lägg till länkar från sitemap.xml om begärt
-    if args.use_sitemap:
-        sm_links = fetch_sitemap(start, verify)
-        if args.verbose:
-            print(f"[INFO] sitemap: hittade {len(sm_links)} länkar")
-        sm_links = [normalize_url(u) for u in sm_links]
-        sm_links = [u for u in sm_links if u and (args.allow_external or same_site(start, u)) and allowed(u) and passes_filters(u) and host_allowed(u)]
-        # prioritera PDF först i sitemap
-        sm_pdfs = [u for u in sm_links if u.lower().endswith('.pdf')]
-        sm_rest = [u for u in sm_links if u not in sm_pdfs]
-        queue.extend((u, 1) for u in unique_preserve(sm_pdfs + sm_rest))
-
-    # 2) Upptäck länkar från startsidan och prioritera IR & PDF
-    links = discover_links(start, body, max_links=1000)
-    same = [u for u in links if (args.allow_external or same_site(start, u)) and passes_filters(u) and host_allowed(u)]
-    pdfs = [u for u in same if u.lower().endswith('.pdf')]
-    irish = [u for u in same if IR_HINTS.search(u) and not u.lower().endswith('.pdf')]
-    rest = [u for u in same if u not in pdfs and u not in irish]
-    if args.verbose:
-        print(f"[INFO] html-links: total={len(same)} ir={len(irish)} pdf={len(pdfs)} rest={len(rest)}")
-    # normalisera och deduplicera i prioriterad ordning
-    prio = unique_preserve([normalize_url(u) for u in irish]) \
-         + unique_preserve([normalize_url(u) for u in pdfs]) \
-         + unique_preserve([normalize_url(u) for u in rest])
-    queue = [(u, 1) for u in prio if u]
-
-    fetched = 1
-    while queue:
-        u, d = queue.pop(0)
-        u_norm = normalize_url(u)
-        if not u_norm:
-            continue
-        if u_norm in seen_norm:
-            continue
-        if (not args.allow_external) and not same_site(start, u_norm):
-            if args.verbose:
-                print(f"[SKIP external] {u_norm}")
-            continue
-        if not allowed(u_norm):
-            if args.verbose:
-                print(f"[SKIP robots] {u_norm}")
-            continue
-        if not passes_filters(u_norm):
-            if args.verbose:
-                print(f"[SKIP filter] {u_norm}")
-            continue
-        if not host_allowed(u_norm):
+        # 2a) Lägg till länkar från sitemap.xml om begärt
+        if args.use_sitemap:
+            sm_links = fetch_sitemap(client, start)
             if args.verbose:
-                print(f"[SKIP host] {u_norm}")
-            continue
-        try:
-            sid, did, st, ch = ingest_one(dsn, u_norm, verify, pdf_to_db=args.pdf_to_db)
-            print(f"[OK d={d}] {u_norm} -> source={_short(sid)} doc={_short(did)} status={st}")
-            seen.add(u_norm)
+                print(f"[INFO] sitemap: hittade {len(sm_links)} länkar")
+            # prioritera PDF först i sitemap (en passage: normalisera, deduplicera, filtrera, dela upp)
+            sm_pdfs, sm_rest = [], []
+            sm_seen = set()
+            for u in map(normalize_url, sm_links):
+                if not u or u in sm_seen:
+                    continue
+                sm_seen.add(u)
+                if admit(u):
+                    (sm_pdfs if u.lower().endswith('.pdf') else sm_rest).append(u)
+            queue.extend(entry(u, 1) for u in sm_pdfs + sm_rest)
+
+        # 2) Upptäck länkar från startsidan och prioritera IR & PDF
+        # discover_links returnerar redan normaliserade URL:er
+        links = discover_links(start, body, max_links=1000)
+        # en passage: deduplicera, filtrera och dela upp i IR / PDF / övrigt
+        irish, pdfs, rest = [], [], []
+        seen_local = set()
+        for u in links:
+            if u in seen_local:
+                continue
+            seen_local.add(u)
+            if not admit(u):
+                continue
+            if u.lower().endswith('.pdf'):
+                pdfs.append(u)
+            elif IR_HINTS.search(u):
+                irish.append(u)
+            else:
+                rest.append(u)
+        if args.verbose:
+            print(f"[INFO] html-links: total={len(irish) + len(pdfs) + len(rest)} ir={len(irish)} pdf={len(pdfs)} rest={len(rest)}")
+        # prioriterad ordning: IR, PDF, övrigt
+        queue.extend(entry(u, 1) for bucket in (irish, pdfs, rest) for u in bucket)
+
+        async def crawl_one(q: asyncio.Queue, aclient: httpx.AsyncClient, u_norm: str, d: int, robots_checked: bool):
+            nonlocal fetched, in_flight
+            # filter, normalisering m.m. är redan gjorda av admit() vid köning
+            if u_norm in seen_norm:
+                return
+            # taket räknar även pågående hämtningar så att parallella workers inte går förbi det;
+            # kvarvarande köposter töms då utan att hämtas
+            if fetched + in_flight >= args.max_pages:
+                return
+            # markera före första await så att ingen annan worker plockar samma URL under robots-hämtningen
             seen_norm.add(u_norm)
-            fetched += 1
-            time.sleep(args.sleep)
+            in_flight += 1
+            try:
+                if not robots_checked:
+                    if not robots_cached(u_norm):
+                        # hämta robots.txt för ny värd utan att blockera event-loopen
+                        await asyncio.to_thread(robots_for, client, u_norm)
+                    if not allowed(u_norm):
+                        seen_norm.discard(u_norm)
+                        if args.verbose:
+                            print(f"[SKIP robots] {u_norm}")
+                        return
+                # en enda GET per URL; samma bytes används för ingest och länkupptäckt
+                try:
+                    resp, body, checksum = await fetch_async(aclient, u_norm)
+                    # blockerande psycopg → tråd
+                    sid, did, st, ch = await asyncio.to_thread(
+                        ingest_content, dsn, u_norm, body,
+                        status=resp.status_code, content_type=resp.headers.get("Content-Type"), etag=resp.headers.get("ETag"),
+                        checksum=checksum, pdf_to_db=args.pdf_to_db, pool=pool,
+                    )
+                except Exception as e:
+                    print(f"[WARN d={d}] {u_norm} -> {e}", file=sys.stderr)
+                    return
+                fetched += 1
+            finally:
+                in_flight -= 1
+            print(f"[OK d={d}] {u_norm} -> source={_short(sid)} doc={_short(did)} status={st}")
             if d < args.max_depth:
                 try:
-                    status, ctype, body = fetch_bytes(u_norm, verify)
                     links = discover_links(u_norm, body, max_links=1000)
-                    # normalisera och filtrera
-                    links = [normalize_url(link) for link in links]
-                    links = [lnk for lnk in links if lnk and (args.allow_external or same_site(start, lnk)) and allowed(lnk) and passes_filters(lnk) and host_allowed(lnk) and lnk not in seen_norm]
+                    links = [lnk for lnk in links if admit(lnk)]
                     if args.verbose:
                         print(f"[INFO d={d}] upptäckta länkar: {len(links)} (efter filter)")
                         print(f"[INFO d={d}] exempel-länkar: {links[:5]}")
                     # lägg som nästa djup
-                    queue.extend((lnk, d+1) for lnk in links)
+                    for lnk in links:
+                        q.put_nowait(entry(lnk, d + 1))
                 except Exception:
                     # Ignore errors in link discovery on subpages
                     pass
-        except Exception as e:
-            print(f"[WARN d={d}] {u} -> {e}", file=sys.stderr)
-            continue
+            await asyncio.sleep(args.sleep)
+
+        async def crawl_worker(q: asyncio.Queue, aclient: httpx.AsyncClient):
+            while True:
+                u, d, robots_checked = await q.get()
+                try:
+                    await crawl_one(q, aclient, u, d, robots_checked)
+                except Exception as e:
+                    print(f"[WARN d={d}] {u} -> {e}", file=sys.stderr)
+                finally:
+                    q.task_done()
+
+        async def run_queue():
+            q: asyncio.Queue = asyncio.Queue()
+            for item in queue:
+                q.put_nowait(item)
+            limits = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+            async with httpx.AsyncClient(http2=True, follow_redirects=True, timeout=30, verify=verify, headers={"User-Agent": USER_AGENT}, limits=limits) as aclient:
+                workers = [asyncio.create_task(crawl_worker(q, aclient)) for _ in range(max(1, args.concurrency))]
+                await q.join()
+                for w in workers:
+                    w.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        asyncio.run(run_queue())
+    finally:
+        pool.close()
+        client.close()
 
     print(f"KLART: {fetched} sidor/objekt ingest:ade från {start}.")
 
@@ -2,8 +2,11 @@ import argparse
 import csv
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from psycopg_pool import ConnectionPool
+
 from listedinc.ingest_url import ingest_one
 
 def main():
@@ -12,6 +15,7 @@ def main():
     ap.add_argument("--insecure", action="store_true", help="Disable TLS verification")
     ap.add_argument("--ca-bundle", type=str, default=None, help="Path till custom CA bundle (PEM)")
     ap.add_argument("--pdf-to-db", action="store_true", help="Lagra PDF i DB (blob_store)")
+    ap.add_argument("--workers", type=int, default=16, help="Antal parallella ingest-trådar (default 16)")
     args = ap.parse_args()
 
     dsn = os.getenv("DATABASE_URL")
@@ -31,7 +35,8 @@ def main():
         print(f"File not found: {p}", file=sys.stderr)
         sys.exit(1)
 
-    total = ok = 0
+    workers = max(1, args.workers)
+    urls = []
     with p.open("r", encoding="utf-8") as f:
         reader = csv.reader(f)
         header = next(reader, [])
@@ -53,9 +58,18 @@ def main():
             url = row[url_idx].strip()
             if not url:
                 continue
-            total += 1
+            urls.append(url)
+
+    total = len(urls)
+    ok = 0
+    # I/O-bundet (HTTP + DB): trådar delar anslutningspool och ingest_url:s delade httpx-klient
+    with ConnectionPool(dsn, min_size=1, max_size=workers, kwargs={"autocommit": True}) as pool, \
+            ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(ingest_one, dsn, url, verify, pdf_to_db=args.pdf_to_db, pool=pool) for url in urls]
+        # resultat i CSV-ordning
+        for url, fut in zip(urls, futures):
             try:
-                sid, did, status, checksum = ingest_one(dsn, url, verify, pdf_to_db=args.pdf_to_db)
+                sid, did, status, checksum = fut.result()
                 ok += 1
                 print(f"[OK] {url} -> source={sid[:8]} doc={did[:8]} status={status} sha={checksum[:12]}…")
             except Exception as e:
@@ -1,14 +1,23 @@
 import argparse
+import atexit
+import bisect
+import contextlib
+import functools
+import itertools
 import os
 import sys
 import hashlib
+import threading
 import httpx
 import psycopg
+from psycopg_pool import ConnectionPool
 import json
 import re
-from bs4 import BeautifulSoup
-import dateparser
+from dateparser.date import DateDataParser
+from datetime import datetime
 from io import BytesIO
+from lxml import etree
+from lxml import html as lxml_html
 from urllib.parse import urlparse
 
 try:
@@ -16,20 +25,131 @@ try:
 except Exception:
     trafilatura = None
 
+try:
+    from trafilatura.utils import load_html as trafilatura_load_html
+except Exception:
+    trafilatura_load_html = None
 
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-PHONE_RE = re.compile(r"(?:(?:\+46|0)\s?\d{1,3}(?:[\s-]?\d{2,3}){2,4})")
+try:
+    import pypdfium2 as pdfium
+except Exception:
+    pdfium = None
 
+# orjson är valfritt – snabbare JSON, annars stdlib json
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
 
-ROLE_HINTS = re.compile(r"\b(VD|CEO|CFO|IR|IR-?chef|IR-?kontakt|Investerarrelationer|Finanschef|Kommunikationschef)\b", re.I)
 
-# Regex for Swedish/Titlecase names
-NAME_CAND_RE = re.compile(r"\b[A-ZÅÄÖ][a-zåäö\-]+(?:\s+[A-ZÅÄÖ][a-zåäö\-]+){1,3}\b")
+def _json_dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _json_loads(raw: str):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+EMAIL_PAT = r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+PHONE_PAT = r"(?:(?:\+46|0)\s?\d{1,3}(?:[\s-]?\d{2,3}){2,4})"
+ROLE_PAT = r"\b(?:VD|CEO|CFO|IR|IR-?chef|IR-?kontakt|Investerarrelationer|Finanschef|Kommunikationschef)\b"
+# Swedish/Titlecase names
+NAME_PAT = r"\b[A-ZÅÄÖ][a-zåäö\-]+(?:\s+[A-ZÅÄÖ][a-zåäö\-]+){1,3}\b"
+DATE_NUM_PAT = r"\b(?:\d{4}-\d{2}-\d{2}|\d{2}[\./-]\d{2}[\./-]\d{4})\b"
+MONTHS_SV = r"januari|februari|mars|april|maj|juni|juli|augusti|september|oktober|november|december"
+DATE_SV_PAT = rf"\b\d{{1,2}}\s+(?:{MONTHS_SV})\s+\d{{4}}\b"
+
+EMAIL_RE = re.compile(EMAIL_PAT)
+DATE_CAND_RE = re.compile(f"({DATE_NUM_PAT})")
+DATE_TEXT_SV_RE = re.compile(f"(?i)({DATE_SV_PAT})")
+MONTH_NUM_SV = {mon: i for i, mon in enumerate(MONTHS_SV.split("|"), 1)}
+
+# En dateparser-instans med fasta inställningar; dateparser.parse(settings=...) bygger om dem vid varje anrop
+DATE_PARSER = DateDataParser(languages=["en", "sv", "de"], settings={"RETURN_AS_TIMEZONE_AWARE": True})
+
+# Alla mönster som en enda alternation: en finditer-passage över texten i stället för en per regex.
+# Ordningen avgör vid samma startposition (e-post före telefon, roll före namn); träffar överlappar inte.
+_SCAN_PATTERNS = (
+    ("email", EMAIL_PAT),
+    ("phone", PHONE_PAT),
+    ("role", f"(?i:{ROLE_PAT})"),
+    ("date_sv", f"(?i:{DATE_SV_PAT})"),
+    ("date_num", DATE_NUM_PAT),
+    # rollord räknas inte som namnord, annars sväljer "Anna Andersson Finanschef" rollen
+    ("name", NAME_PAT.replace("[A-ZÅÄÖ]", f"(?!(?i:{ROLE_PAT}))[A-ZÅÄÖ]")),
+)
+_SCAN_KINDS = frozenset(kind for kind, _ in _SCAN_PATTERNS)
+
+
+@functools.lru_cache(maxsize=None)
+def _combined_regex(kinds: frozenset = _SCAN_KINDS) -> re.Pattern:
+    return re.compile("|".join(f"(?P<{kind}>{pat})" for kind, pat in _SCAN_PATTERNS if kind in kinds))
+
+
+# Hela sidans synliga text: e-post, telefon och roll. Namn används inte på sidnivå, och datum söks
+# separat – i en gemensam alternation kan en telefonträff (utan vänsterankare) äta upp ett datum.
+PAGE_SCAN_RE = _combined_regex(frozenset({"email", "phone", "role"}))
+
+
+class _KeepChars(dict):
+    """str.translate-tabell som behåller tecken där keep(tecken) är sant och tar bort resten; fylls vid behov."""
+    def __init__(self, keep):
+        super().__init__()
+        self.keep = keep
+
+    def __missing__(self, c: int):
+        v = c if self.keep(chr(c)) else None
+        self[c] = v
+        return v
+
+
+_DIGITS_ONLY = _KeepChars(str.isdecimal)  # som re \d
+_NAME_INITIALS_ONLY = _KeepChars(lambda ch: ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZÅÄÖ")
+
+
+def _scan_regex_for(text: str) -> re.Pattern:
+    """Kombinerad regex utan de alternativ som inte kan matcha någonstans i text: ett telefonnummer
+    kräver minst 6 siffror, datum 5 resp. 8, ett namn två versala initialer och e-post ett @.
+    Räkningen är en translate i C; utan alternativen blir resultatet detsamma men NFA:n mindre."""
+    digits = len(text.translate(_DIGITS_ONLY))
+    kinds = {"role"}
+    if "@" in text:
+        kinds.add("email")
+    if digits >= 5:
+        kinds.add("date_sv")
+        if digits >= 6:
+            kinds.add("phone")
+        if digits >= 8:
+            kinds.add("date_num")
+    if len(text.translate(_NAME_INITIALS_ONLY)) >= 2:
+        kinds.add("name")
+    return _combined_regex(frozenset(kinds))
+
+
+def _scan_near(text: str, lo: int, hi: int) -> dict[str, str]:
+    """Träffen per sort som ligger närmast intervallet [lo, hi) i text (vid lika avstånd den tidigare).
+    Ett namn inne i själva intervallet (elementets egen länktext) används bara om inget annat namn finns."""
+    found: dict[str, str] = {}
+    dist: dict[str, int] = {}
+    for m in _scan_regex_for(text).finditer(text):
+        kind = m.lastgroup
+        d = max(lo - m.end(), m.start() - hi, 0)
+        if d == 0 and kind == "name":
+            d = len(text)
+        if d < dist.get(kind, len(text) + 1):
+            dist[kind] = d
+            found[kind] = m.group(0)
+    return found
+
 
 # Helpers: normalize Swedish phone formats
 def _normalize_phone(p: str) -> str:
     raw = p.strip()
-    digits = re.sub(r"\D", "", raw)
+    digits = raw.translate(_DIGITS_ONLY)
     # normalize +46.. to 0..
     if digits.startswith("46") and not digits.startswith("460"):
         digits = "0" + digits[2:]
@@ -55,226 +175,306 @@ def _normalize_phone_set(phones: set[str]) -> list[str]:
     return sorted(normed)
 
 # DOM helper functions for contextual people extraction
-def _collect_near_text(el, max_chars: int = 400) -> str:
-    """Collect text around an element: parent + prev/next siblings, limited length."""
-    parts = []
-    try:
-        if el.parent:
-            parts.append(el.parent.get_text(" ", strip=True))
-        # previous siblings
-        prev = []
-        sib = el.previous_sibling
-        k = 0
-        while sib is not None and k < 3:
-            if hasattr(sib, 'get_text'):
-                prev.append(sib.get_text(" ", strip=True))
-            elif isinstance(sib, str):
-                prev.append(sib.strip())
-            sib = sib.previous_sibling
-            k += 1
-        # next siblings
-        nxt = []
-        sib = el.next_sibling
-        k = 0
-        while sib is not None and k < 3:
-            if hasattr(sib, 'get_text'):
-                nxt.append(sib.get_text(" ", strip=True))
-            elif isinstance(sib, str):
-                nxt.append(sib.strip())
-            sib = sib.next_sibling
-            k += 1
-        parts = prev[::-1] + parts + nxt
-        txt = " ".join([p for p in parts if p])
-        return txt[:max_chars]
-    except Exception:
-        return ""
-
-def _guess_name(text: str) -> str | None:
-    m = NAME_CAND_RE.search(text)
-    return m.group(0) if m else None
-
-def _guess_role(text: str) -> str | None:
-    m = ROLE_HINTS.search(text)
-    return m.group(0) if m else None
-
-def _extract_people_from_dom(soup: BeautifulSoup) -> list[dict]:
-    people: dict[str, dict] = {}
+class _People:
+    """Personer som parallella listor (email/name/role/phone) med index per gemen e-post.
+
+    Första värdet per fält vinner; dict-posterna byggs först i as_list().
+    """
+
+    __slots__ = ("idx_of", "emails", "names", "roles", "phones")
+
+    def __init__(self) -> None:
+        self.idx_of: dict[str, int] = {}
+        self.emails: list[str] = []
+        self.names: list[str | None] = []
+        self.roles: list[str | None] = []
+        self.phones: list[str | None] = []
+
+    def add(self, em: str, name: str | None = None, role: str | None = None, phone: str | None = None) -> None:
+        key = (em or "").strip().lower()
+        if not key:
+            return
+        i = self.idx_of.setdefault(key, len(self.emails))
+        if i == len(self.emails):
+            self.emails.append(em)
+            self.names.append(None)
+            self.roles.append(None)
+            self.phones.append(None)
+        self.names[i] = self.names[i] or name
+        self.roles[i] = self.roles[i] or role
+        self.phones[i] = self.phones[i] or phone
+
+    def as_list(self) -> list[dict]:
+        return [
+            {"email": e, **({"name": n} if n else {}), **({"role": r} if r else {}), **({"phone": ph} if ph else {})}
+            for e, n, r, ph in zip(self.emails, self.names, self.roles, self.phones)
+        ]
+
+def _people_entry(people: _People, em: str, hits: dict[str, str]) -> None:
+    phone = hits.get("phone")
+    people.add(em, hits.get("name"), hits.get("role"), _normalize_phone(phone) if phone else None)
+
+def _extract_people_from_dom(mailto: list[tuple[str, dict]], cfemail: list[tuple[str | None, dict]], people: _People) -> None:
+    """People around mailto anchors and [data-cfemail] elements, given as (href / decoded email, scan hits of the context)."""
     # mailto anchors
-    for a in soup.find_all('a', href=True):
-        href = (a.get('href') or '').strip().lower()
-        if href.startswith('mailto:'):
-            em = href.split(':',1)[1].split('?',1)[0]
-            ctx = _collect_near_text(a)
-            name = _guess_name(ctx)
-            role = _guess_role(ctx)
-            ph_match = PHONE_RE.search(ctx)
-            entry = people.get(em, {"email": em})
-            if name and not entry.get("name"):
-                entry["name"] = name
-            if role and not entry.get("role"):
-                entry["role"] = role
-            if ph_match and not entry.get("phone"):
-                entry["phone"] = _normalize_phone(ph_match.group(0))
-            people[em] = entry
+    for href, hits in mailto:
+        em = href.lower().split(':',1)[1].split('?',1)[0]
+        _people_entry(people, em, hits)
     # cloudflare elements
-    for el in soup.select('[data-cfemail]'):
-        dec = _cf_decode_email(el.get('data-cfemail','') or '')
+    for dec, hits in cfemail:
         if not dec:
             continue
-        ctx = _collect_near_text(el)
-        name = _guess_name(ctx)
-        role = _guess_role(ctx)
-        ph_match = PHONE_RE.search(ctx)
-        entry = people.get(dec, {"email": dec})
-        if name and not entry.get("name"):
-            entry["name"] = name
-        if role and not entry.get("role"):
-            entry["role"] = role
-        if ph_match and not entry.get("phone"):
-            entry["phone"] = _normalize_phone(ph_match.group(0))
-        people[dec] = entry
-    return list(people.values())
+        _people_entry(people, dec, hits)
+
+_XP_H1 = etree.XPath("//h1")
+_XP_H2 = etree.XPath("//h2")
+_XP_TIME = etree.XPath("//time")
+_XP_CFEMAIL = etree.XPath("//*[@data-cfemail]")
+_XP_JSONLD = etree.XPath("//script[@type='application/ld+json']")
+
+META_DATE_NAME_RE = re.compile(r"date|pub|publish", re.I)
+META_KEYWORDS_NAME_RE = re.compile(r"keywords|tags", re.I)
+
+# Text i script/style/template och kommentarer räknas inte som synlig
+_NON_VISIBLE_TAGS = frozenset({"script", "style", "template"})
+
+
+def _parse_html_doc(html: str):
+    try:
+        try:
+            return lxml_html.document_fromstring(html)
+        except ValueError:
+            # str med XML-deklaration (encoding=...) – låt lxml läsa bytes i stället
+            return lxml_html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return lxml_html.document_fromstring("<html></html>")
+
+
+def _text_walk(root, marked=frozenset()) -> tuple[list[str], dict]:
+    """Synliga textnoder under root i dokumentordning (utan roots egen tail), plus textintervall
+    (start, slut) i "\\n".join(parts) för elementen i marked – allt i en enda trädvandring.
+    (etree.iterwalk hoppar över kommentarer och deras tail-text, därav en egen stack.)"""
+    parts = []
+    spans = {}
+    n = 0  # len("\n".join(parts))
+    stack = [(root, False)]
+    while stack:
+        el, closing = stack.pop()
+        if closing:
+            if el in marked:
+                spans[el] = (spans[el], n)
+            if el.tail and el is not root:
+                n += len(el.tail) + (1 if parts else 0)
+                parts.append(el.tail)
+            continue
+        if el in marked:
+            spans[el] = n
+        if el.text and isinstance(el.tag, str) and el.tag not in _NON_VISIBLE_TAGS:
+            n += len(el.text) + (1 if parts else 0)
+            parts.append(el.text)
+        stack.append((el, True))
+        stack.extend((child, False) for child in reversed(el))
+    return parts, spans
+
+
+def _first_metas(metas) -> tuple:
+    """Första <meta> för published_time, datumnamn och keywords – en passage över alla meta-element."""
+    published = date = keywords = None
+    for meta in metas:
+        if published is None and meta.get("property") == "article:published_time":
+            published = meta
+        name = meta.get("name")
+        if name:
+            if date is None and META_DATE_NAME_RE.search(name):
+                date = meta
+            if keywords is None and META_KEYWORDS_NAME_RE.search(name):
+                keywords = meta
+    return published, date, keywords
+
+
+def _split_anchors(anchors) -> tuple[list, list]:
+    """En passage över <a>: (element, href) för mailto-länkar och element med rel som innehåller 'tag'."""
+    mailto = []
+    rel_tags = []
+    for a in anchors:
+        href = (a.get("href") or "").strip()
+        if href[:7].lower() == "mailto:":
+            mailto.append((a, href))
+        if "tag" in (a.get("rel") or ""):
+            rel_tags.append(a)
+    return mailto, rel_tags
+
+
+# Kontextfönster kring ett e-postelement: högst så här många tecken synlig text före och efter,
+# och aldrig utanför föräldraelementet (som tidigare förälder + syskon)
+NEAR_CHARS = 400
+
+
+def _html_facts_lxml(html: str, doc=None) -> dict:
+    if doc is None:
+        doc = _parse_html_doc(html)
+    headings = [h.text_content().strip() for h in _XP_H1(doc)] + [h.text_content().strip() for h in _XP_H2(doc)]
+    # datumkandidater i prioritetsordning
+    meta_pt, meta_date, meta_kw = _first_metas(doc.iter("meta"))
+    # datumkandidater i prioritetsordning
+    dates = [meta.get("content") for meta in (meta_pt, meta_date) if meta is not None]
+    times = _XP_TIME(doc)
+    if times:
+        dates.append(times[0].get("datetime") or times[0].text_content().strip())
+    mailto, rel_tags = _split_anchors(doc.iter("a"))
+
+    # Synlig text och e-postelementens positioner i den tas fram i samma vandring;
+    # kontexten blir sedan ett utsnitt av texten i stället för en egen trädvandring per element
+    cfemail = _XP_CFEMAIL(doc)
+    marked = {a for a, _ in mailto} | set(cfemail)
+    marked |= {el.getparent() for el in marked} - {None}
+    parts, spans = _text_walk(doc, marked)
+    visible_text = "\n".join(parts)
+    # Kontexten delas med NUL i stället för radbrytning (samma offsets): NAME_PAT:s \s+ kan då inte
+    # foga ihop ord från olika textnoder, t.ex. länktexten "Mejla" och nästa stycke
+    context_text = "\0".join(parts) if marked else ""
+
+    def near(el) -> dict[str, str]:
+        lo, hi = spans[el]
+        parent = el.getparent()
+        plo, phi = spans[parent] if parent is not None else (lo, hi)
+        w0 = max(plo, lo - NEAR_CHARS)
+        return _scan_near(context_text[w0:min(phi, hi + NEAR_CHARS)], lo - w0, hi - w0)
+
+    return {
+        "headings": headings,
+        "dates": dates,
+        "keywords": meta_kw.get("content") if meta_kw is not None else None,
+        "rel_tags": [a.text_content().strip() for a in rel_tags],
+        "mailto": [(href, near(a)) for a, href in mailto],
+        "cfemail": [(el.get("data-cfemail"), near(el)) for el in cfemail],
+        "visible_text": visible_text,
+        "jsonld": [node.text for node in _XP_JSONLD(doc)],
+    }
+
+
+# XOR-tabeller för bytes.translate, en per nyckelbyte: avkodningen blir en C-loop i stället för chr() per tecken
+_CF_XOR_TABLES = [bytes(b ^ key for b in range(256)) for key in range(256)]
 
 # Helper: decode Cloudflare email protection
 def _cf_decode_email(hexstr: str) -> str | None:
     try:
         data = bytes.fromhex(hexstr)
-        key = data[0]
-        return ''.join(chr(b ^ key) for b in data[1:])
+        return data[1:].translate(_CF_XOR_TABLES[data[0]]).decode('latin-1')
     except Exception:
         return None
 
-# Helper: extract/validate phones from text
-def _extract_phones_from_text(text: str) -> set[str]:
-    cands = set(m.group(0).strip() for m in PHONE_RE.finditer(text))
+# Helper: validate phone candidates
+def _validated_phones(matches) -> set[str]:
+    cands = set(p.strip() for p in matches)
     out: set[str] = set()
     for p in cands:
-        digits = re.sub(r'\D', '', p)
+        digits = p.translate(_DIGITS_ONLY)
         if digits.startswith('46') and not digits.startswith('460'):
             digits = '0' + digits[2:]
         if 8 <= len(digits) <= 11 and re.search(r'[1-9]', digits):
             out.add(p)
     return set(_normalize_phone_set(out))
 
-def extract_html_metadata(html_bytes: bytes) -> dict:
+def extract_html_metadata(html_bytes: bytes, doc=None) -> dict:
+    """`doc` är ett redan tolkat lxml-träd för html_bytes (t.ex. från feed-parsern i fetch_hashed)."""
     html = html_bytes.decode("utf-8", errors="ignore")
-    soup = BeautifulSoup(html, "lxml")
+    facts = _html_facts_lxml(html, doc)
 
     # Headings
-    h1 = [h.get_text(strip=True) for h in soup.find_all("h1")]
-    h2 = [h.get_text(strip=True) for h in soup.find_all("h2")]
-    headings = [t for t in (h1 + h2) if t]
+    headings = [t for t in facts["headings"] if t]
 
-    # Published time candidates
+    # Published time candidates: article:published_time, meta date/pub, <time>
     published_at = None
-    # <meta property="article:published_time" content="...">
-    meta_pt = soup.find("meta", attrs={"property": "article:published_time"})
-    if meta_pt and meta_pt.get("content"):
-        published_at = dateparser.parse(meta_pt["content"], settings={"RETURN_AS_TIMEZONE_AWARE": True})
-    if not published_at:
-        meta_date = soup.find("meta", attrs={"name": re.compile(r"date|pub|publish", re.I)})
-        if meta_date and meta_date.get("content"):
-            published_at = dateparser.parse(meta_date["content"], settings={"RETURN_AS_TIMEZONE_AWARE": True})
-    if not published_at:
-        t = soup.find("time")
-        if t and (t.get("datetime") or t.get_text(strip=True)):
-            published_at = dateparser.parse(t.get("datetime") or t.get_text(strip=True), settings={"RETURN_AS_TIMEZONE_AWARE": True})
+    for val in facts["dates"]:
+        if val:
+            published_at = DATE_PARSER.get_date_data(val).date_obj
+        if published_at:
+            break
 
     # Tags / keywords
     tags = []
-    meta_kw = soup.find("meta", attrs={"name": re.compile(r"keywords|tags", re.I)})
-    if meta_kw and meta_kw.get("content"):
-        for token in re.split(r",|;|\|", meta_kw["content"]):
+    if facts["keywords"]:
+        for token in re.split(r",|;|\|", facts["keywords"]):
             token = token.strip()
             if token:
                 tags.append(token)
-    for a in soup.find_all("a", rel=lambda v: v and "tag" in v):
-        txt = a.get_text(strip=True)
+    for txt in facts["rel_tags"]:
         if txt:
             tags.append(txt)
     tags = list(dict.fromkeys(tags))  # dedupe, preserve order
 
     # Contacts: emails via mailto and visible text
     emails = set()
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        if href.lower().startswith("mailto:"):
-            addr = href.split(":", 1)[1].split("?", 1)[0]
-            if addr:
-                emails.add(addr)
+    for href, _ in facts["mailto"]:
+        addr = href.split(":", 1)[1].split("?", 1)[0]
+        if addr:
+            emails.add(addr)
     # also scan text quickly
     for m in EMAIL_RE.finditer(html):
         emails.add(m.group(0))
-    # Cloudflare email protection (data-cfemail)
-    for el in soup.select('[data-cfemail]'):
-        dec = _cf_decode_email(el.get('data-cfemail', ''))
+    # Cloudflare email protection (data-cfemail): avkodas en gång, används även för personerna nedan
+    cfemail = [(_cf_decode_email(hexstr or ''), hits) for hexstr, hits in facts["cfemail"]]
+    for dec, _ in cfemail:
         if dec:
             emails.add(dec)
 
+    # En passage över synlig text: telefoner, e-post per rad och rollrader
+    visible_text = facts["visible_text"]
+    raw_lines = visible_text.splitlines(keepends=True)
+    # radernas startoffset: träffens rad fås med bisect i stället för att dela upp texten per rad
+    line_starts = list(itertools.accumulate(map(len, raw_lines), initial=0))
+    phone_cands = []
+    email_to_idx = {}
+    role_lines = set()
+    for m in PAGE_SCAN_RE.finditer(visible_text):
+        kind = m.lastgroup
+        if kind == "phone":
+            phone_cands.append(m.group(0))
+            continue
+        li = bisect.bisect_right(line_starts, m.start()) - 1
+        if kind == "email":
+            email_to_idx.setdefault(m.group(0), li)
+        else:
+            role_lines.add(li)
+
     # Phones from visible text (validated)
-    visible_text = soup.get_text("\n")
-    phones = _extract_phones_from_text(visible_text)
+    phones = _validated_phones(phone_cands)
 
     # DOM-based people extraction around email elements
-    dom_people = _extract_people_from_dom(soup)
+    people = _People()
+    _extract_people_from_dom(facts["mailto"], cfemail, people)
+
+    # Heuristic: fill in people based on lines around emails (DOM-värden har företräde)
+    # bara raderna runt varje e-post behövs, så de trimmas vid behov
+    def line(j: int) -> str:
+        return raw_lines[j].strip()
 
-    # Heuristic: build simple people list based on lines around emails
-    people = []
-    lines = [ln.strip() for ln in visible_text.splitlines()]
-    # Build a quick index of line -> email hits
-    email_to_idx = {}
-    for idx, ln in enumerate(lines):
-        for em in EMAIL_RE.findall(ln):
-            email_to_idx.setdefault(em, idx)
     for em, idx in email_to_idx.items():
         name = None
         role = None
         # look up to 3 lines above for a name-like line
         for j in range(max(0, idx-3), idx):
-            cand = lines[j].strip()
+            cand = line(j)
             if 2 <= cand.count(" ") <= 4 and cand.istitle():
                 name = cand
         # also consider immediate previous non-empty line
         k = idx-1
-        while k >= 0 and not lines[k].strip():
+        while k >= 0 and not line(k):
             k -= 1
         if k >= 0 and not name:
-            prev = lines[k].strip()
+            prev = line(k)
             # prefer two-token proper names
             if len(prev.split()) in (2,3):
                 name = prev
         # role below (or above) with role hints
         for j in (idx+1, idx+2, idx-1):
-            if 0 <= j < len(lines):
-                if ROLE_HINTS.search(lines[j]):
-                    role = lines[j].strip()
+            if 0 <= j < len(raw_lines):
+                if j in role_lines:
+                    role = line(j)
                     break
-        entry = {"email": em}
-        if name:
-            entry["name"] = name
-        if role:
-            entry["role"] = role
-        people.append(entry)
-
-    # Merge DOM-based people with line-heuristic
-    merged: dict[str, dict] = {}
-    for p in dom_people + people:
-        em = (p.get("email") or "").strip().lower()
-        if not em:
-            continue
-        cur = merged.get(em, {})
-        # prefer entries that have name/role
-        if not cur:
-            merged[em] = p
-        else:
-            if not cur.get("name") and p.get("name"):
-                cur["name"] = p["name"]
-            if not cur.get("role") and p.get("role"):
-                cur["role"] = p["role"]
-            if not cur.get("phone") and p.get("phone"):
-                cur["phone"] = p["phone"]
-            merged[em] = cur
-    people = list(merged.values())
+        people.add(em, name, role)
+    people = people.as_list()
 
     # Merge contacts payload
     contacts_payload = {"emails": sorted(emails)}
@@ -284,9 +484,9 @@ def extract_html_metadata(html_bytes: bytes) -> dict:
         contacts_payload["people"] = people
 
     # JSON-LD (schema.org)
-    for node in soup.find_all("script", attrs={"type": "application/ld+json"}):
+    for raw in facts["jsonld"]:
         try:
-            data = json.loads(node.string or "{}")
+            data = _json_loads(raw or "{}")
             objs = data if isinstance(data, list) else [data]
             for obj in objs:
                 if not isinstance(obj, dict):
@@ -294,7 +494,7 @@ def extract_html_metadata(html_bytes: bytes) -> dict:
                 if not published_at:
                     for k in ("datePublished", "dateCreated", "dateModified"):
                         if obj.get(k):
-                            parsed = dateparser.parse(str(obj[k]), settings={"RETURN_AS_TIMEZONE_AWARE": True})
+                            parsed = DATE_PARSER.get_date_data(str(obj[k])).date_obj
                             if parsed:
                                 published_at = parsed
                                 break
@@ -313,10 +513,7 @@ def extract_html_metadata(html_bytes: bytes) -> dict:
     if not published_at and visible_text:
         m = DATE_TEXT_SV_RE.search(visible_text)
         if m:
-            published_at = dateparser.parse(
-                m.group(1),
-                settings={"RETURN_AS_TIMEZONE_AWARE": True, "PREFER_DAY_OF_MONTH": "first"}
-            )
+            published_at = _parse_date_sv(m.group(1))
         if not published_at:
             m2 = DATE_CAND_RE.search(visible_text)
             if m2:
@@ -331,28 +528,53 @@ def extract_html_metadata(html_bytes: bytes) -> dict:
     return payload
 
 
+# Storleksgränser för textextraktion: större sidor hoppas över, stora sidor kapas
+SKIP_EXTRACT_BYTES = 5_000_000
+MAX_EXTRACT_BYTES = 2_000_000
+
+
+def _load_html_tree(data: bytes):
+    # trafilaturas egen load_html sköter teckenkodning och deklarationer; annars lxml direkt
+    if trafilatura_load_html is not None:
+        tree = trafilatura_load_html(data)
+        if tree is not None:
+            return tree
+    html = data.decode("utf-8", errors="ignore")
+    try:
+        return lxml_html.fromstring(html)
+    except Exception:
+        return html  # t.ex. XML-deklaration i str – låt trafilatura tolka själv
+
+
 def extract_text_and_title(html_bytes: bytes) -> tuple[str, str | None]:
     if not trafilatura:
         return html_bytes.decode("utf-8", errors="ignore"), None
-    html = html_bytes.decode("utf-8", errors="ignore")
-    text = trafilatura.extract(html, include_comments=False, include_links=False, favor_precision=True) or ""
-    meta = trafilatura.metadata.extract_metadata(html)
+    if len(html_bytes) > SKIP_EXTRACT_BYTES:
+        return "", None
+    # Tolka DOM:en en gång och dela trädet mellan metadata och textextraktion
+    doc = _load_html_tree(html_bytes[:MAX_EXTRACT_BYTES])
+    # metadata först: extract() kan städa trädet på plats
+    meta = trafilatura.metadata.extract_metadata(doc)
     title = getattr(meta, "title", None) if meta else None
+    text = trafilatura.extract(doc, include_comments=False, include_links=False, favor_precision=True) or ""
     return text.strip(), title
 
-DATE_CAND_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2}|\d{2}[\./-]\d{2}[\./-]\d{4})\b")
-
-MONTHS_SV = r"januari|februari|mars|april|maj|juni|juli|augusti|september|oktober|november|december"
-DATE_TEXT_SV_RE = re.compile(rf"\b(\d{{1,2}}\s+(?:{MONTHS_SV})\s+\d{{4}})\b", re.I)
-
 def _try_parse_date(val: str):
     if not val:
         return None
     try:
-        return dateparser.parse(val, settings={"RETURN_AS_TIMEZONE_AWARE": True})
+        return DATE_PARSER.get_date_data(val).date_obj
     except Exception:
         return None
 
+def _parse_date_sv(val: str):
+    """'12 mars 2024' (DATE_SV_PAT) utan dateparser; lokal tidszon som dateparser."""
+    try:
+        d, mon, y = val.split()
+        return datetime(int(y), MONTH_NUM_SV[mon.lower()], int(d)).astimezone()
+    except (ValueError, KeyError):
+        return None
+
 def _parse_pdf_datetime(pdf_dt: str):
     # PDF dates often like D:YYYYMMDDHHmmSS+TZ
     try:
@@ -366,37 +588,74 @@ def _parse_pdf_datetime(pdf_dt: str):
         mm = mm or '00'
         ss = ss or '00'
         iso = f"{y}-{mo}-{d} {hh}:{mm}:{ss}"
-        return dateparser.parse(iso, settings={"RETURN_AS_TIMEZONE_AWARE": True})
+        return DATE_PARSER.get_date_data(iso).date_obj
     except Exception:
         return None
 
+# text ur de första sidorna (för fart)
+PDF_TEXT_PAGES = 2
+
+
+def _pdf_meta_date(meta: dict):
+    for key in ("CreationDate", "ModDate", "creationDate", "modDate"):
+        if meta.get(key):
+            dt = _parse_pdf_datetime(str(meta[key]))
+            if dt:
+                return dt
+    return None
+
+
+def _pdf_text_and_date_pdfium(content: bytes):
+    # PDFium (C++) via pypdfium2: mycket snabbare än pdfminer-baserade pdfplumber
+    pdf = pdfium.PdfDocument(content)
+    try:
+        try:
+            dt_found = _pdf_meta_date(pdf.get_metadata_dict())
+        except Exception:
+            dt_found = None
+        chunks = []
+        for i in range(min(PDF_TEXT_PAGES, len(pdf))):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            t = textpage.get_text_range().replace("\r\n", "\n")
+            textpage.close()
+            page.close()
+            if t:
+                chunks.append(t)
+        return "\n\n".join(chunks).strip(), dt_found
+    finally:
+        pdf.close()
+
+
+def _pdf_text_and_date_pdfplumber(content: bytes):
+    import pdfplumber
+    with pdfplumber.open(BytesIO(content)) as pdf:
+        # metadata date
+        try:
+            dt_found = _pdf_meta_date(pdf.metadata or {})
+        except Exception:
+            dt_found = None
+        chunks = []
+        for p in pdf.pages[:PDF_TEXT_PAGES]:
+            t = p.extract_text() or ""
+            if t:
+                chunks.append(t)
+        return "\n\n".join(chunks).strip(), dt_found
+
+
 def extract_pdf_text_and_date(content: bytes, url: str) -> tuple[str, str | None]:
     text = ""
     dt_found = None
     try:
-        import pdfplumber
-        with pdfplumber.open(BytesIO(content)) as pdf:
-            # metadata date
-            try:
-                meta = pdf.metadata or {}
-                for key in ("CreationDate", "ModDate", "creationDate", "modDate"):
-                    if key in meta and not dt_found:
-                        dt_found = _parse_pdf_datetime(str(meta[key]))
-            except Exception:
-                pass
-            # text (first 2 pages for speed)
-            pages = pdf.pages[:2] if len(pdf.pages) > 2 else pdf.pages
-            chunks = []
-            for p in pages:
-                t = p.extract_text() or ""
-                if t:
-                    chunks.append(t)
-            text = "\n\n".join(chunks).strip()
-            # search dates in text if still missing
-            if not dt_found and text:
-                m = DATE_CAND_RE.search(text)
-                if m:
-                    dt_found = _try_parse_date(m.group(0))
+        if pdfium is not None:
+            text, dt_found = _pdf_text_and_date_pdfium(content)
+        else:
+            text, dt_found = _pdf_text_and_date_pdfplumber(content)
+        # search dates in text if still missing
+        if not dt_found and text:
+            m = DATE_CAND_RE.search(text)
+            if m:
+                dt_found = _try_parse_date(m.group(0))
     except Exception:
         pass
     # filename date as fallback
@@ -429,32 +688,137 @@ def store_blob(conn, data: bytes, content_type: str) -> str:
         return row[0]
 
 
-def ingest_one(dsn: str, url: str, verify, pdf_to_db: bool=False) -> tuple[str, str, int, str]:
-    # Fetch
-    with httpx.Client(follow_redirects=True, timeout=45, verify=verify) as c:
-        r = c.get(url)
-    status = r.status_code
-    content = r.content
-    etag = r.headers.get("ETag")
-    checksum = hashlib.sha256(content).hexdigest()
+# Övre gräns för en hämtad body (PDF:er kan vara stora, men inte obegränsat)
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+def content_length_exceeds(r: httpx.Response, max_bytes: int) -> bool:
+    try:
+        return int(r.headers.get("Content-Length") or 0) > max_bytes
+    except ValueError:
+        return False
+
+
+def is_pdf_content(url: str, content_type: str | None) -> bool:
+    return url.lower().endswith(".pdf") or (content_type or "").lower().startswith("application/pdf")
+
+
+def fetch_hashed(client: httpx.Client, url: str, max_bytes: int = MAX_BODY_BYTES,
+                 parser=None) -> tuple[httpx.Response, bytes, str]:
+    """Strömma url, räkna sha256 löpande och avbryt tidigt (BodyTooLarge) om body blir för stor.
+    Med `parser` (lxml feed-parser) matas HTML-svar till parsern chunk för chunk under läsningen."""
+    with client.stream("GET", url) as r:
+        if content_length_exceeds(r, max_bytes):
+            raise BodyTooLarge(f"{url}: Content-Length > {max_bytes} bytes")
+        feed = parser.feed if parser is not None and not is_pdf_content(url, r.headers.get("Content-Type")) else None
+        h = hashlib.sha256()
+        chunks = []
+        size = 0
+        for chunk in r.iter_bytes(65536):
+            size += len(chunk)
+            if size > max_bytes:
+                raise BodyTooLarge(f"{url}: body > {max_bytes} bytes")
+            h.update(chunk)
+            chunks.append(chunk)
+            if feed is not None:
+                feed(chunk)
+    return r, b"".join(chunks), h.hexdigest()
+
+
+def _close_feed_parser(parser):
+    """Trädet från en feed-parser, eller None om inget (giltigt) matats in."""
+    if parser is None:
+        return None
+    try:
+        return parser.close()
+    except etree.LxmlError:
+        return None
+
+
+def _connection(dsn: str, conn: psycopg.Connection | None, pool: ConnectionPool | None):
+    if conn is not None:
+        return contextlib.nullcontext(conn)
+    if pool is not None:
+        return pool.connection()
+    return psycopg.connect(dsn, autocommit=True)
+
+
+# Delade klienter per verify-värde (True/False/CA-bundle): TCP/TLS-anslutningar återanvänds mellan
+# ingest_one-anrop och HTTP/2 multiplexar förfrågningar mot samma värd. httpx.Client är trådsäker.
+_CLIENTS: dict = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _client(verify) -> httpx.Client:
+    c = _CLIENTS.get(verify)
+    if c is None:
+        with _CLIENTS_LOCK:
+            c = _CLIENTS.get(verify)
+            if c is None:
+                c = _CLIENTS[verify] = httpx.Client(
+                    http2=True,
+                    follow_redirects=True,
+                    timeout=45,
+                    verify=verify,
+                    limits=httpx.Limits(max_keepalive_connections=64),
+                )
+    return c
+
+
+@atexit.register
+def _close_clients() -> None:
+    with _CLIENTS_LOCK:
+        for c in _CLIENTS.values():
+            c.close()
+        _CLIENTS.clear()
+
+
+def ingest_one(dsn: str, url: str, verify, pdf_to_db: bool=False, conn: psycopg.Connection | None = None,
+               client: httpx.Client | None = None, pool: ConnectionPool | None = None) -> tuple[str, str, int, str]:
+    """Hämta url och skriv source + document. Med `conn` återanvänds en öppen (autocommit-)anslutning
+    och med `pool` lånas en ur en psycopg_pool, i stället för en ny connect per URL;
+    med `client` används den klienten, annars en delad klient per `verify`."""
+    # Fetch (strömmad, sha256 räknas och HTML tolkas av lxml under läsningen; utf-8 som vid decode)
+    parser = lxml_html.HTMLParser(encoding="utf-8")
+    r, content, checksum = fetch_hashed(client or _client(verify), url, parser=parser)
+    return ingest_content(
+        dsn, url, content,
+        status=r.status_code, content_type=r.headers.get("Content-Type"), etag=r.headers.get("ETag"),
+        checksum=checksum, pdf_to_db=pdf_to_db, conn=conn, pool=pool, tree=_close_feed_parser(parser),
+    )
+
+
+def ingest_content(dsn: str, url: str, content: bytes, *, status: int, content_type: str | None = None,
+                   etag: str | None = None, checksum: str | None = None, pdf_to_db: bool = False,
+                   conn: psycopg.Connection | None = None,
+                   pool: ConnectionPool | None = None, tree=None) -> tuple[str, str, int, str]:
+    """Skriv redan hämtat innehåll som source + document (ingen egen nätverkshämtning).
+    Används av crawlern som redan har sidans bytes; `checksum` (sha256) om den räknats under hämtningen,
+    `tree` om HTML:en redan tolkats med lxml."""
+    if checksum is None:
+        checksum = hashlib.sha256(content).hexdigest()
 
     # Classify
-    is_pdf = url.lower().endswith(".pdf") or r.headers.get("Content-Type", "").lower().startswith("application/pdf")
+    is_pdf = is_pdf_content(url, content_type)
     source_type = "pdf" if is_pdf else "html"
 
     # Extract for HTML
     if not is_pdf:
         text_plain, title = extract_text_and_title(content)
-        rich = extract_html_metadata(content)
-        headings_json = json.dumps(rich.get("headings", []))
-        tags_json = json.dumps(rich.get("tags", []))
-        contacts_json = json.dumps(rich.get("contacts", {}))
+        rich = extract_html_metadata(content, tree)
+        headings_json = _json_dumps(rich.get("headings", []))
+        tags_json = _json_dumps(rich.get("tags", []))
+        contacts_json = _json_dumps(rich.get("contacts", {}))
         published_at_val = rich.get("published_at")
     else:
         text_plain, title = "", os.path.basename(url) or "PDF"
-        headings_json = json.dumps([])
-        tags_json = json.dumps([])
-        contacts_json = json.dumps({})
+        headings_json = _json_dumps([])
+        tags_json = _json_dumps([])
+        contacts_json = _json_dumps({})
         published_at_val = None
 
         # PDF text + date extraction
@@ -464,80 +828,56 @@ def ingest_one(dsn: str, url: str, verify, pdf_to_db: bool=False) -> tuple[str,
         if (not published_at_val) and pdf_dt_iso:
             published_at_val = pdf_dt_iso
 
-    with psycopg.connect(dsn, autocommit=True) as conn:
+    with _connection(dsn, conn, pool) as conn:
         with conn.cursor() as cur:
-            # 0) Finns source redan för denna URL?
-            cur.execute(
-                "SELECT id, checksum_sha256 FROM source WHERE url=%s ORDER BY discovered_at DESC LIMIT 1",
-                (url,),
-            )
-            row = cur.fetchone()
-            source_id = None
-
-            if row:
-                existing_source_id, prev_sha = row
-                if prev_sha == checksum:
-                    # Inget nytt: uppdatera metadata och återanvänd senaste dokumentet om det finns
-                    cur.execute(
-                        "UPDATE source SET http_status=%s, etag=%s, last_fetched_at=now() WHERE id=%s",
-                        (status, etag, existing_source_id),
-                    )
-                    cur.execute(
-                        "SELECT id FROM document WHERE source_id=%s ORDER BY created_at DESC LIMIT 1",
-                        (existing_source_id,),
-                    )
-                    drow = cur.fetchone()
-                    existing_doc_id = drow[0] if drow else None
-                    return existing_source_id, (existing_doc_id or ""), status, checksum
-                else:
-                    # Innehållet har ändrats: uppdatera befintlig source-rad och fortsätt skapa nytt dokument
-                    cur.execute(
-                        "UPDATE source SET checksum_sha256=%s, http_status=%s, etag=%s, last_fetched_at=now() WHERE id=%s",
-                        (checksum, status, etag, existing_source_id),
-                    )
-                    source_id = existing_source_id
-            else:
-                # Ny källa
-                cur.execute(
-                    """
+            # En rundresa: upserta source (unik på lower(url)) och skapa nytt dokument bara om
+            # checksumman ändrats – prev ser raden som den var före upserten.
+            # doc_id = nyss skapat dokument, last_doc_id = senaste befintliga (för oförändrat innehåll).
+            source_id, document_id, last_doc_id = cur.execute(
+                """
+                WITH prev AS (
+                    SELECT id, checksum_sha256 FROM source WHERE lower(url) = lower(%(url)s)
+                ), up AS (
                     INSERT INTO source (company_id, url, source_type, discovered_at, last_fetched_at, http_status, etag, checksum_sha256, robots_allowed)
-                    VALUES (NULL, %s, %s, now(), now(), %s, %s, %s, TRUE)
-                    RETURNING id
-                    """,
-                    (url, source_type, status, etag, checksum),
-                )
-                source_id = cur.fetchone()[0]
-
-            # 1) Skapa nytt dokument (förändrat eller ny URL)
-            if is_pdf:
-                cur.execute(
-                    """
-                    INSERT INTO document (source_id, doc_type, title, text_plain, lang,
-                                           html_snapshot_url, pdf_blob_url, created_at,
-                                           published_at, headings, contacts, tags, checksum_sha256)
-                    VALUES (%s, 'report', %s, %s, NULL, NULL, %s, now(), %s, %s, %s, %s, %s)
+                    VALUES (NULL, %(url)s, %(source_type)s, now(), now(), %(status)s, %(etag)s, %(checksum)s, TRUE)
+                    ON CONFLICT ((lower(url))) DO UPDATE
+                       SET checksum_sha256=EXCLUDED.checksum_sha256, http_status=EXCLUDED.http_status,
+                           etag=EXCLUDED.etag, last_fetched_at=now()
                     RETURNING id
-                    """,
-                    (source_id, title or "PDF", text_plain, url,
-                     published_at_val, headings_json, contacts_json, tags_json, checksum),
-                )
-            else:
-                cur.execute(
-                    """
+                ), doc AS (
                     INSERT INTO document (source_id, doc_type, title, text_plain, lang,
-                                           html_snapshot_url, pdf_blob_url, created_at,
-                                           published_at, headings, contacts, tags, checksum_sha256)
-                    VALUES (%s, 'unknown', %s, %s, NULL, %s, NULL, now(), %s, %s, %s, %s, %s)
+                                          html_snapshot_url, pdf_blob_url, created_at,
+                                          published_at, headings, contacts, tags, checksum_sha256)
+                    SELECT up.id, %(doc_type)s, %(title)s, %(text_plain)s, NULL, %(html_url)s, %(pdf_url)s, now(),
+                           %(published_at)s, %(headings)s, %(contacts)s, %(tags)s, %(checksum)s
+                      FROM up LEFT JOIN prev ON prev.id = up.id
+                     WHERE prev.checksum_sha256 IS DISTINCT FROM %(checksum)s
                     RETURNING id
-                    """,
-                    (source_id, title or "Untitled", text_plain, url,
-                     published_at_val, headings_json, contacts_json, tags_json, checksum),
                 )
-            document_id = cur.fetchone()[0]
-
-            # 2) Spara original-PDF i DB om flaggat
+                SELECT up.id,
+                       (SELECT id FROM doc),
+                       (SELECT id FROM document WHERE source_id = up.id ORDER BY created_at DESC LIMIT 1)
+                  FROM up
+                """,
+                {
+                    "url": url, "source_type": source_type, "status": status, "etag": etag, "checksum": checksum,
+                    "doc_type": "report" if is_pdf else "unknown",
+                    "title": (title or "PDF") if is_pdf else (title or "Untitled"),
+                    "text_plain": text_plain,
+                    "html_url": None if is_pdf else url,
+                    "pdf_url": url if is_pdf else None,
+                    "published_at": published_at_val,
+                    "headings": headings_json, "contacts": contacts_json, "tags": tags_json,
+                },
+            ).fetchone()
+
+            if document_id is None:
+                # Inget nytt: source-metadata är uppdaterad, återanvänd senaste dokumentet om det finns
+                return source_id, (last_doc_id or ""), status, checksum
+
+            # Spara original-PDF i DB om flaggat
             if is_pdf and pdf_to_db:
-                blob_id = store_blob(conn, content, r.headers.get("Content-Type", "application/pdf"))
+                blob_id = store_blob(conn, content, content_type if content_type is not None else "application/pdf")
                 cur.execute("UPDATE document SET blob_id=%s WHERE id=%s", (blob_id, document_id))
 
     return source_id, document_id, status, checksum
@@ -1,28 +1,102 @@
 import os
 import sys
+import functools
 import hashlib
+import mmap
 import mimetypes
 import datetime as dt
 import psycopg
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-DATA_ROOT = Path(os.getenv("DATA_ROOT", "data")).resolve()
-
-
-def sha256_file(p: Path, chunk: int = 1024 * 1024) -> str:
-    h = hashlib.sha256()
-    with p.open("rb") as f:
-        while True:
-            b = f.read(chunk)
-            if not b:
-                break
-            h.update(b)
-    return h.hexdigest()
+try:
+    import blake3
+except Exception:
+    blake3 = None
 
+DATA_ROOT = Path(os.getenv("DATA_ROOT", "data")).resolve()
 
-def category_for(path_under_root: Path) -> str | None:
-    parts = path_under_root.parts
-    return parts[0] if parts else None
+# LISTEDINC_HASH=blake3 byter filhash; värdet lagras då i file_object.checksum_blake3 (checksum_sha256 blir NULL)
+HASH_ALGO = os.getenv("LISTEDINC_HASH", "sha256").lower()
+# större filer mappas in i minnet så att blake3 får en sammanhängande buffert
+MMAP_MIN_BYTES = 4 * 1024 * 1024
+
+
+def sha256_file(p: Path | str) -> str:
+    with open(p, "rb", buffering=0) as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def blake3_file(p: Path | str) -> str:
+    with open(p, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size > MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return blake3.blake3(mm).hexdigest()
+        return blake3.blake3(f.read()).hexdigest()
+
+
+def file_checksums(p: Path | str) -> tuple[str | None, str | None]:
+    """Filens checksummor (sha256, blake3); bara den som LISTEDINC_HASH väljer räknas, den andra är None."""
+    if HASH_ALGO == "blake3":
+        if blake3 is None:
+            raise RuntimeError("LISTEDINC_HASH=blake3 kräver paketet blake3 (pip install blake3)")
+        return None, blake3_file(p)
+    return sha256_file(p), None
+
+
+# giltiga värden för file_object.category (första katalognivån under DATA_ROOT)
+CATEGORIES = frozenset({"pdf", "html", "images", "other"})
+
+mimetypes.init()
+# Komprimerade/sammansatta ändelser (.gz, .tgz, ...) beror på hela namnet och går via guess_type
+_MIME_SPECIAL_EXTS = frozenset(mimetypes.encodings_map) | frozenset(mimetypes.suffix_map)
+
+
+def file_suffix(name: str) -> str:
+    """Som Path(name).suffix."""
+    i = name.rfind(".")
+    return name[i:] if 0 < i < len(name) - 1 else ""
+
+
+@functools.lru_cache(maxsize=256)
+def _mime_for_ext(suffix: str) -> str | None:
+    # ett fåtal olika ändelser per inventering, så guess_type körs en gång per ändelse
+    return mimetypes.guess_type("x" + suffix)[0]
+
+
+def mime_for(name: str, suffix: str) -> str | None:
+    """Som mimetypes.guess_type(name)[0], med suffix = file_suffix(name)."""
+    if not suffix:
+        return None
+    if suffix in _MIME_SPECIAL_EXTS or suffix.lower() in _MIME_SPECIAL_EXTS or not name[:-len(suffix)].strip("."):
+        return mimetypes.guess_type(name)[0]
+    return _mime_for_ext(suffix)
+
+
+def walk_dirs(root: str):
+    """Som os.walk(root) men ger (katalog, filernas DirEntry); DirEntry bär filtyp och stat-cache."""
+    stack = [root]
+    while stack:
+        top = stack.pop()
+        try:
+            with os.scandir(top) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        files = []
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                files.append(entry)
+            elif not entry.is_symlink():
+                subdirs.append(entry.path)
+        yield top, files
+        # omvänd ordning på stacken ger samma top-down-ordning som os.walk
+        stack.extend(reversed(subdirs))
 
 
 def main():
@@ -36,7 +110,8 @@ def main():
         sys.exit(1)
 
     files_seen = 0
-    with psycopg.connect(dsn, autocommit=True) as conn:
+    # hashlib släpper GIL:en, så filerna hashas parallellt medan DB-skrivningarna sker i huvudtråden
+    with psycopg.connect(dsn, autocommit=True) as conn, ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
         with conn.cursor() as cur:
             row = cur.execute(
                 "SELECT id FROM storage_location WHERE root_path=%s",
@@ -50,51 +125,48 @@ def main():
                     ("local-raw", str(DATA_ROOT)),
                 ).fetchone()[0]
 
-            for root, _dirs, files in os.walk(DATA_ROOT):
-                root_path = Path(root)
-                rel_dir = root_path.relative_to(DATA_ROOT).as_posix() if root_path != DATA_ROOT else ""
+            root_str = str(DATA_ROOT)
+            dir_ids = {}
+            for top, files in walk_dirs(root_str):
+                rel_dir = top[len(root_str):].lstrip(os.sep).replace(os.sep, "/")
 
-                if root_path == DATA_ROOT:
-                    parent_id = None
-                else:
-                    parent_rel = root_path.parent.relative_to(DATA_ROOT).as_posix()
-                    prow = cur.execute(
-                        "SELECT id FROM directory WHERE location_id=%s AND rel_path=%s",
-                        (loc_id, parent_rel),
-                    ).fetchone()
-                    parent_id = prow[0] if prow else None
+                # föräldern har redan besökts (top-down), så dess id finns i dir_ids
+                parent_id = dir_ids.get(rel_dir.rpartition("/")[0]) if rel_dir else None
 
                 did = cur.execute(
                     "SELECT get_or_create_directory(%s,%s,%s)",
                     (loc_id, rel_dir, parent_id),
                 ).fetchone()[0]
+                dir_ids[rel_dir] = did
+
+                # kategori = första katalognivån under DATA_ROOT (för filer i roten: filnamnet)
+                dir_cat = rel_dir.partition("/")[0]
+                dir_cat_ok = dir_cat if dir_cat in CATEGORIES else None
 
                 present_names = []
-                for name in files:
+                metas = []
+                for entry in files:
+                    name = entry.name
                     present_names.append(name)
-                    p = root_path / name
-                    rel_under_root = p.relative_to(DATA_ROOT)
-                    cat = category_for(rel_under_root)
+                    cat = dir_cat_ok if dir_cat else (name if name in CATEGORIES else None)
 
-                    stat = p.stat()
+                    stat = entry.stat()
                     size = stat.st_size
                     mtime = dt.datetime.fromtimestamp(stat.st_mtime, tz=dt.timezone.utc)
-                    ext = p.suffix.lower()
-                    ctype = mimetypes.guess_type(p.name)[0] or "application/octet-stream"
-                    sha = sha256_file(p)
-
-                    fid = cur.execute(
-                        "SELECT upsert_file_object(%s,%s,%s,%s,%s,%s,%s)",
-                        (did, name, ext, size, mtime, ctype, sha),
-                    ).fetchone()[0]
-
-                    if cat in {"pdf", "html", "images", "other"}:
-                        cur.execute("UPDATE file_object SET category=%s WHERE id=%s", (cat, fid))
-
-                    files_seen += 1
-
-                cur.execute("SELECT mark_missing_as_deleted(%s,%s)", (did, present_names))
-                cur.execute("UPDATE directory SET scanned_at=now() WHERE id=%s", (did,))
+                    suffix = file_suffix(name)
+                    ext = suffix.lower()
+                    ctype = mime_for(name, suffix) or "application/octet-stream"
+                    metas.append((entry.path, (did, name, ext, size, mtime, ctype), cat))
+
+                sums = pool.map(file_checksums, [p for p, _row, _cat in metas])
+                rows = [row + (sha, cat, b3) for (_p, row, cat), (sha, b3) in zip(metas, sums)]
+                # pipeline-läge: katalogens upserts, borttagsmarkering och scanned_at skickas
+                # i ett svep utan att vänta in svar per sats
+                with conn.pipeline():
+                    cur.executemany("SELECT upsert_file_object(%s,%s,%s,%s,%s,%s,%s,%s,%s)", rows)
+                    cur.execute("SELECT mark_missing_as_deleted(%s,%s)", (did, present_names))
+                    cur.execute("UPDATE directory SET scanned_at=now() WHERE id=%s", (did,))
+                files_seen += len(metas)
 
     print(f"Inventory complete. Files processed: {files_seen}")
 
@@ -0,0 +1,28 @@
+import pytest
+
+LINKS_HTML = """<html><body>
+<a href="/investors/rapporter">Rapporter</a>
+<a href="https://bolag.se/ir/q4-2024.pdf">Q4</a>
+<a href="mailto:ir@bolag.se">IR</a>
+<a name="ankare">utan href</a>
+<a href="">tom</a>
+<p><a href="?sida=2&amp;sort=datum">Nästa</a></p>
+<a href="/om-oss/styrelse">Styrelse – Åsa Öberg</a>
+</body></html>""".encode("utf-8")
+
+
+def test_iter_hrefs_same_with_selectolax_and_bs4(monkeypatch):
+    pytest.importorskip("selectolax")
+    import listedinc.crawl_site as cs
+
+    assert cs.LexborHTMLParser is not None
+    fast = [h for h in cs._iter_hrefs(LINKS_HTML) if h]
+    monkeypatch.setattr(cs, "LexborHTMLParser", None)
+    fallback = [h for h in cs._iter_hrefs(LINKS_HTML) if h]
+    assert fast == fallback == [
+        "/investors/rapporter",
+        "https://bolag.se/ir/q4-2024.pdf",
+        "mailto:ir@bolag.se",
+        "?sida=2&sort=datum",
+        "/om-oss/styrelse",
+    ]
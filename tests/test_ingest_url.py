@@ -0,0 +1,76 @@
+import pytest
+
+
+def test_nbsp_phone_and_date():
+    from listedinc.ingest_url import extract_html_metadata
+    html = "<html><body><p>Tel 08&nbsp;123&nbsp;45&nbsp;67</p><p>Publicerad 12&nbsp;mars&nbsp;2024</p></body></html>"
+    meta = extract_html_metadata(html.encode("utf-8"))
+    assert meta["published_at"].startswith("2024-03-12")
+    assert meta["contacts"]["phones"] == ["08-123 45 67"]
+
+
+CONTACT_CARDS = """<html><body>
+<div class="card"><h3>Erik Berg</h3><p>VD</p><a href="mailto:erik@bolag.se">Mejla</a><p>Tel: 08-123 45 67</p></div>
+<div class="card"><h3>Anna Lind</h3><p>Finanschef</p><a href="mailto:anna.lind@bolag.se">Skicka e-post</a></div>
+</body></html>"""
+
+
+def test_people_from_contact_cards():
+    from listedinc.ingest_url import extract_html_metadata
+    people = extract_html_metadata(CONTACT_CARDS.encode("utf-8"))["contacts"]["people"]
+    assert people == [
+        {"email": "erik@bolag.se", "name": "Erik Berg", "role": "VD", "phone": "08-123 45 67"},
+        {"email": "anna.lind@bolag.se", "name": "Anna Lind", "role": "Finanschef"},
+    ]
+
+
+def test_reingest_url_differing_in_case_hits_lower_url_conflict():
+    import os
+    import uuid
+
+    psycopg = pytest.importorskip("psycopg")
+    from listedinc.ingest_url import ingest_content
+
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        pytest.skip("DATABASE_URL saknas")
+    try:
+        conn = psycopg.connect(dsn)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"ingen databas: {e}")
+    try:
+        if conn.execute("SELECT to_regclass('source')").fetchone()[0] is None:
+            pytest.skip("schemat (db/schema.sql) är inte laddat")
+        path = f"/IR/Rapport-{uuid.uuid4().hex}"
+        html = b"<html><head><title>Rapport</title></head><body><h1>Rapport</h1></body></html>"
+
+        sid1, did1, _, _ = ingest_content(dsn, "https://bolag.se" + path, html, status=200, conn=conn)
+        # samma innehåll, URL som bara skiljer i skiftläge: samma source, inget nytt dokument
+        sid2, did2, _, _ = ingest_content(dsn, "https://BOLAG.se" + path.lower(), html, status=200, conn=conn)
+        assert (sid2, did2) == (sid1, did1)
+        # ändrat innehåll: nytt dokument på samma source
+        sid3, did3, _, _ = ingest_content(dsn, "https://bolag.SE" + path.upper(), html.replace(b"<h1>", b"<h1>Ny "),
+                                          status=200, conn=conn)
+        assert sid3 == sid1 and did3 not in ("", did1)
+
+        n_sources = conn.execute("SELECT count(*) FROM source WHERE lower(url) = lower(%s)",
+                                 ("https://bolag.se" + path,)).fetchone()[0]
+        n_docs = conn.execute("SELECT count(*) FROM document WHERE source_id = %s", (sid1,)).fetchone()[0]
+        assert (n_sources, n_docs) == (1, 2)
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def test_swedish_date_on_english_page():
+    from listedinc.ingest_url import extract_html_metadata
+    html = '<html lang="en"><body><p>Published 15 mars 2024</p></body></html>'
+    meta = extract_html_metadata(html.encode("utf-8"))
+    assert meta["published_at"].startswith("2024-03-15")
+
+
+@pytest.mark.parametrize("text", ["Rapport Q4 2020 2024-02-15", "Ring 08 123 45 67 2024-02-15"])
+def test_date_after_digit_run(text):
+    from listedinc.ingest_url import extract_html_metadata
+    meta = extract_html_metadata(f"<html><body><p>{text}</p></body></html>".encode("utf-8"))
+    assert meta["published_at"].startswith("2024-02-15")
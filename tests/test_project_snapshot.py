@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import PROJECT_SNAPSHOT as snap  # noqa: E402
+
+
+@pytest.mark.parametrize("data", [b"", b"a", b"a\n", b"a\nb", b"\n\n\n", b"rad 1\nrad 2\r\nrad 3\n" * 1000 + b"sista"])
+def test_count_lines_numba_matches_block_count(tmp_path, data):
+    pytest.importorskip("numba")
+    pytest.importorskip("numpy")
+    p = tmp_path / "f.txt"
+    p.write_bytes(data)
+    expected = snap.count_lines(p)
+    assert expected == len(data.splitlines(keepends=True))
+    # tom fil kan inte mmap:as; då faller numba-vägen tillbaka till None
+    assert snap._count_lines_numba(p) == (expected if data else None)
+    assert snap.count_lines(p, size=snap.NUMBA_MIN_BYTES) == expected